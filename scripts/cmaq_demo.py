@@ -2,18 +2,13 @@
 This is an example of using siem to build CMAQ emission files.
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import xarray as xr
 from siem.siem import EmissionSource, GroupSources, PointSources
 from siem.spatial import read_spatial_proxy
 
-wrfinput = xr.open_dataset("../data/wrfinput_d02")
-_, ncol, nrow = wrfinput.XLAT.values.shape
-
-spatial_proxy = read_spatial_proxy(
-    "../data/highways_hdv.csv", (nrow, ncol), ["id", "x", "y", "longKm"], proxy="longKm"
-)
-
 temporal_profile = [
     0.019,
     0.012,
@@ -103,50 +98,91 @@ pm_exa = {
     "ECC": 0.0,
 }
 
-gasoline_vehicles = EmissionSource(
-    "Gasoline vehicles",
-    2_686_528,
-    13_495 / 365,
-    gasoline_ef,
-    spatial_proxy,
-    temporal_profile,
-    gas_voc_exa,
-    pm_exa,
-)
-
-
-flex_ethanol_vehicles = EmissionSource(
-    "Flex Ethanol vehicle",
-    203_893,
-    14_744 / 365,
-    flex_ethanol_ef,
-    spatial_proxy,
-    temporal_profile,
-    gas_voc_exa,
-    pm_exa,
-)
-
-
-flex_gasoline_vehicles = EmissionSource(
-    "Flex vehicles",
-    203_893,
-    14_744 / 365,
-    flex_gasol_ef,
-    spatial_proxy,
-    temporal_profile,
-    gas_voc_exa,
-    pm_exa,
-)
-
-
 date_start, date_end = "2018-07-01", "2018-07-03"
 
-sources = [gasoline_vehicles, flex_ethanol_vehicles, flex_gasoline_vehicles]
-
-all_in_one = GroupSources(sources)
+griddesc_path = "../data/GRIDDESC"
 
 
-griddesc_path = "../data/GRIDDESC"
-emiss_source = all_in_one.to_cmaq(
-    wrfinput, griddesc_path, 2, date_start, date_end, week_profile, write_netcdf=True
-)
+def build_sources(wrfinput: xr.Dataset) -> GroupSources:
+    ncol, nrow = wrfinput.sizes["west_east"], wrfinput.sizes["south_north"]
+    spatial_proxy = read_spatial_proxy(
+        "../data/highways_hdv.csv",
+        (ncol, nrow),
+        ["id", "x", "y", "longKm"],
+        proxy="longKm",
+    )
+
+    gasoline_vehicles = EmissionSource(
+        "Gasoline vehicles",
+        2_686_528,
+        13_495 / 365,
+        gasoline_ef,
+        spatial_proxy,
+        temporal_profile,
+        gas_voc_exa,
+        pm_exa,
+    )
+
+    flex_ethanol_vehicles = EmissionSource(
+        "Flex Ethanol vehicle",
+        203_893,
+        14_744 / 365,
+        flex_ethanol_ef,
+        spatial_proxy,
+        temporal_profile,
+        gas_voc_exa,
+        pm_exa,
+    )
+
+    flex_gasoline_vehicles = EmissionSource(
+        "Flex vehicles",
+        203_893,
+        14_744 / 365,
+        flex_gasol_ef,
+        spatial_proxy,
+        temporal_profile,
+        gas_voc_exa,
+        pm_exa,
+    )
+
+    sources = [gasoline_vehicles, flex_ethanol_vehicles, flex_gasoline_vehicles]
+    return GroupSources(sources)
+
+
+# Inputs of run_day, set once in each worker process by init_worker.
+worker_inputs = {}
+
+
+def init_worker(wrfinput: xr.Dataset, all_in_one: GroupSources) -> None:
+    worker_inputs["wrfinput"] = wrfinput
+    worker_inputs["all_in_one"] = all_in_one
+
+
+def run_day(day: str) -> None:
+    # Each day is an independent CMAQ emission file.
+    worker_inputs["all_in_one"].to_cmaq(
+        worker_inputs["wrfinput"],
+        griddesc_path,
+        2,
+        day,
+        day,
+        week_profile,
+        write_netcdf=True,
+    )
+
+
+def main() -> None:
+    wrfinput = xr.open_dataset("../data/wrfinput_d02")
+    all_in_one = build_sources(wrfinput)
+
+    days = pd.date_range(date_start, date_end, freq="D").strftime("%Y-%m-%d")
+    with ProcessPoolExecutor(
+        max_workers=min(len(days), os.cpu_count() or 1),
+        initializer=init_worker,
+        initargs=(wrfinput, all_in_one),
+    ) as executor:
+        list(executor.map(run_day, days))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,10 @@ for reading point sources emission files in a .csv
 import numpy as np
 import pandas as pd
 import xarray as xr
-import siem.point as pt
-import siem.wrfchemi as wc
-import siem.temporal as tt
 from siem.siem import PointSources
 from siem.point import read_point_sources
 import warnings
 
-warnings.filterwarnings(
-    "ignore", message="IOAPI_ISPH is assumed to be 6370000.; consistent with WRF"
-)
-
 
 def create_sample_data(geogrid: xr.Dataset) -> pd.DataFrame:
     lat = np.arange(geogrid.XLAT_M.min(), geogrid.XLAT_M.max(), 0.05)
@@ -51,7 +44,7 @@ if __name__ == "__main__":
     emiss_path = "../data/point_emiss_veih.csv"
 
     geo = xr.open_dataset(geogrid_path)
-    _, nrow, ncol = geo.XLAT_M.shape
+    nrow, ncol = geo.sizes["south_north"], geo.sizes["west_east"]
     wrfinput = xr.open_dataset(wrfinput_path)
 
     emiss = create_sample_data(geo)
@@ -98,15 +91,19 @@ if __name__ == "__main__":
 
     griddesc = "../data/GRIDDESC"
 
-    my_cmaq = my_spc.to_cmaq(
-        wrfinput,
-        griddesc,
-        5,
-        "2024-05-10",
-        "2024-05-15",
-        week_profile,
-        write_netcdf=True,
-        path="../results/",
-    )
+    with warnings.catch_warnings():
+        warnings.filterwarnings(
+            "ignore", message="IOAPI_ISPH is assumed to be 6370000.; consistent with WRF"
+        )
+        my_cmaq = my_spc.to_cmaq(
+            wrfinput,
+            griddesc,
+            5,
+            "2024-05-10",
+            "2024-05-15",
+            week_profile,
+            write_netcdf=True,
+            path="../results/",
+        )
 
     print("All Done")
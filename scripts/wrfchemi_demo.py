@@ -10,10 +10,10 @@ from siem.siem import GroupSources
 from siem.spatial import read_spatial_proxy
 
 wrfinput = xr.open_dataset("../data/wrfinput_d02")
-_, ncol, nrow = wrfinput.XLAT.values.shape
+ncol, nrow = wrfinput.sizes["west_east"], wrfinput.sizes["south_north"]
 
 spatial_proxy = read_spatial_proxy(
-    "../data/highways_hdv.csv", (nrow, ncol), ["id", "x", "y", "longKm"], proxy="longKm"
+    "../data/highways_hdv.csv", (ncol, nrow), ["id", "x", "y", "longKm"], proxy="longKm"
 )
 
 temporal_profile = [
@@ -10,7 +10,14 @@ setup(
     author="Mario Gavidia-Calderón",
     author_email="mario.calderon@iag.usp.br",
     packages=find_packages(),
-    install_requires=["xarray", "pyproj", "osmnx", "pseudonetcdf", "geopandas"],
+    install_requires=[
+        "xarray",
+        "dask",
+        "pyproj",
+        "osmnx",
+        "pseudonetcdf",
+        "geopandas",
+    ],
     long_description=long_description,
     long_description_content_type="text/markdown",
     license="MIT",
@@ -7,10 +7,12 @@ It requires the wrfinput, and GRIDDESC files.
 It contains the following functions:
 
     - `calculate_julian(date)` - Returns: timestamp in julian date.
+    - `calculate_hhmmss(time)` - Returns: time of day as HHMMSS.
     - `convert_str_to_julian(date, fmt)` - Returns: date string in julian.
     - `create_date_limits(date, fmt)` - Returns: day and the next day in julian.
     - `create_hour_matrix(date, hour, n_var)` - Returns: a matrix for one hour of day.
     - `create_tflag_matrix(date, n_var)` - Returns: tflag matrix for 25 hours.
+    - `create_tflag_matrix_batch(dates, n_var)` - Returns: tflag matrices of many days.
     - `create_tflag_variable(date, n_var)` - Returns: TFLAG variable in xr.DataArray.
     - `to_25hr_profile(temporal_profile)` - Returns: a 25 hour temporal profile (added first hour of next day).
     - `transform_cmaq_units(spatial_emiss, pol_ef_mw, cell_area, pm_name)` - Returns: spatial emissions in CMAQ units.
@@ -18,11 +20,13 @@ It contains the following functions:
     - `speciate_cmaq(spatial_emiss_units, voc_spc, pm_spc, cell_area, voc_name, pm_name)` - Returns: speciated VOC and PM emissions.
     - `add_cmaq_emission_attrs(speciated_cmap, voc_spc, pm_spc, voc_name, pm_name)` - Returns: CMAQ emission dataset with each variables with attributes.
     - `create_var_list_attrs(speciated_cmaq_attrs)` - Returns: the VAR list global attribute.
+    - `read_griddesc(griddesc_path)` - Returns: GRIDDESC file, read once per path.
     - `create_global_attrs(speciated_cmaq_attrs, griddesc_path)` - Returns: global attributes of CMAQ emission file.
     - `prepare_netcdf_cmaq(specated_cmaq, date, griddesc_path, btrim, voc_spc, pm_spc, voc_name, pm_name)` - Returns: xr.Dataset with CMAQ netcdf format.
-    - `save_cmaq_file(cmaq, path)` - Saves xr.dataset CMAQ emission into netcdf.
+    - `save_cmaq_file(cmaq, path, nc_format)` - Saves xr.dataset CMAQ emission into netcdf.
     - `merge_cmaq_source_emiss(cmaq_sources_day)` - Returns: different sources emission adition per day by source.
-    - `sum_cmaq_source(day_source_emission)`- Returns: total emissions from different sources.
+    - `update_tflag_day(sum_source, tflag_m)`- Returns: one day emission with correct TFLAG.
+    - `sum_cmaq_sources(day_source_emission)`- Returns: total emissions from different sources with correct TFLAGS.
     - `update_tflag_sources(sum_sources_by_day)`- Corrects/update TFLAGS variable of sum_cmaq_source product.
 """
 
@@ -32,10 +36,21 @@ import pandas as pd
 import xarray as xr
 import PseudoNetCDF as pnc
 import datetime as dt
-from siem.emiss import speciate_emission
+from functools import lru_cache
+from siem.emiss import speciate_emission_batch
 from siem.user import check_create_savedir
 
+IOAPI_VERSION = f"{'ioapi-3.2: $Id: init3.F90 98 2018-04-05 14:35:07Z coats $':<80}"
+EXEC_ID = f"{'?' * 16:<80}"
+FILEDESC = f"{'Merged emissions output file from Mrggrid':<80}"
+TFLAG_ATTRS = {
+    "units": "<YYYYDD,HHMMSS>",
+    "long_name": "TFLAG",
+    "var_desc": f"{'Timestep-valid flags:  (1) YYYYDDD or (2) HHMMSS':<80}",
+}
 
+
+@lru_cache(maxsize=512)
 def calculate_julian(date: pd.Timestamp) -> int:
     """Calculate julian date.
 
@@ -50,6 +65,19 @@ def calculate_julian(date: pd.Timestamp) -> int:
     return year * 1000 + jul
 
 
+def calculate_hhmmss(time: dt.datetime) -> int:
+    """Pack time of day as HHMMSS integer.
+
+    Args:
+        time: Date and time.
+
+    Returns:
+        Time of day as HHMMSS.
+    """
+    return time.hour * 10000 + time.minute * 100 + time.second
+
+
+@lru_cache(maxsize=512)
 def convert_str_to_julian(date: str, fmt: str = "%Y-%m-%d") -> int:
     """Convert date in string to julian (int).
 
@@ -61,10 +89,11 @@ def convert_str_to_julian(date: str, fmt: str = "%Y-%m-%d") -> int:
         Julian day.
 
     """
-    date_dt = pd.to_datetime(date, format=fmt)
+    date_dt = pd.Timestamp(dt.datetime.strptime(date, fmt))
     return calculate_julian(date_dt)
 
 
+@lru_cache(maxsize=512)
 def create_date_limits(date: str, fmt: str = "%Y-%m-%d") -> tuple:
     """Create day and the day after as julian.
 
@@ -75,8 +104,8 @@ def create_date_limits(date: str, fmt: str = "%Y-%m-%d") -> tuple:
     Returns:
         Date and the date after in julian.
     """
-    date = pd.to_datetime(date, format=fmt)
-    next_date = date + pd.DateOffset(1)
+    date = pd.Timestamp(dt.datetime.strptime(date, fmt))
+    next_date = date + pd.Timedelta(days=1)
     start_julian = calculate_julian(date)
     end_julian = calculate_julian(next_date)
     return (start_julian, end_julian)
@@ -99,6 +128,7 @@ def create_hour_matrix(date: int, hour: int, n_var: int) -> np.ndarray:
     return np.repeat(hour, n_var, axis=0)
 
 
+@lru_cache(maxsize=64)
 def create_tflag_matrix(date: str, n_var: int) -> np.ndarray:
     """Create the tflag matrix based on 25 hour emission.
 
@@ -107,14 +137,41 @@ def create_tflag_matrix(date: str, n_var: int) -> np.ndarray:
         n_var: Number of emission species in emission file.
 
     Returns:
-        TFLAG matrix with correct dimensions.
+        TFLAG matrix with correct dimensions. It is cached, so it is read-only.
     """
     day_start, day_end = create_date_limits(date)
-    tflag_m = np.empty((25, n_var, 2))
-    for hour in range(24):
-        tflag_m[hour] = create_hour_matrix(day_start, hour, n_var)
-    tflag_m[-1] = create_hour_matrix(day_end, 0, n_var)
-    return tflag_m.astype("int32")
+    dates = np.full(25, day_start, dtype="int32")
+    dates[-1] = day_end
+    hours = np.arange(25, dtype="int32") * 10000
+    hours[-1] = 0
+    date_hour = np.stack([dates, hours], axis=1)
+    tflag_m = np.broadcast_to(date_hour[:, None, :], (25, n_var, 2)).copy()
+    tflag_m.flags.writeable = False
+    return tflag_m
+
+
+def create_tflag_matrix_batch(dates: typing.Sequence[str], n_var: int) -> np.ndarray:
+    """Create the tflag matrices of many days at once.
+
+    Args:
+        dates: Days of emission.
+        n_var: Number of emission species in emission file.
+
+    Returns:
+        TFLAG matrices of each day, with shape (days, 25, n_var, 2).
+    """
+    days = pd.to_datetime(dates, format="%Y-%m-%d")
+    next_days = days + pd.Timedelta(days=1)
+    dates_m = np.repeat(
+        (days.year * 1000 + days.day_of_year).to_numpy("int32")[:, None], 25, axis=1
+    )
+    dates_m[:, -1] = next_days.year * 1000 + next_days.day_of_year
+    hours = np.arange(25, dtype="int32") * 10000
+    hours[-1] = 0
+    date_hour = np.stack([dates_m, np.broadcast_to(hours, dates_m.shape)], axis=-1)
+    return np.broadcast_to(
+        date_hour[:, :, None, :], (len(days), 25, n_var, 2)
+    ).copy()
 
 
 def create_tflag_variable(date: str, n_var: int) -> xr.DataArray:
@@ -127,20 +184,15 @@ def create_tflag_variable(date: str, n_var: int) -> xr.DataArray:
     Returns:
         TFLAG variable with correct dimensions and attributes.
     """
-    tflag = xr.DataArray(
-        data=create_tflag_matrix(date, n_var),
-        dims=["TSTEP", "VAR", "DATE-TIME"],
-        attrs={
-            "units": "<YYYYDD,HHMMSS>",
-            "long_name": "TFLAG",
-            "var_desc": f"{'Timestep-valid flags:  (1) YYYYDDD or (2) HHMMSS':<80}",
-        },
+    return xr.DataArray(
+        data=create_tflag_matrix(date, n_var).copy(),
+        dims=("TSTEP", "VAR", "DATE-TIME"),
+        attrs=TFLAG_ATTRS.copy(),
+        name="TFLAG",
     )
-    tflag.name = "TFLAG"
-    return tflag
 
 
-def to_25hr_profile(temporal_profile: list[float]) -> list[float]:
+def to_25hr_profile(temporal_profile: list[float]) -> np.ndarray:
     """Create a 25 hour temporal profile from the 24 hour temporal_profile.
 
     Args:
@@ -149,9 +201,8 @@ def to_25hr_profile(temporal_profile: list[float]) -> list[float]:
     Returns:
         25 hour temporal profile for CMAQ emission file.
     """
-    prof_25h = [h for h in temporal_profile]
-    prof_25h.append(prof_25h[0])
-    return prof_25h
+    prof_24h = np.asarray(temporal_profile)
+    return np.concatenate([prof_24h, prof_24h[:1]])
 
 
 def transform_cmaq_units(
@@ -171,9 +222,13 @@ def transform_cmaq_units(
     Returns:
         Emitted species (not speciated) in CMAQ units.
     """
-    for pol_name, pol_mw in pol_ef_mw.items():
-        spatial_emiss[pol_name] *= cell_area / pol_mw[1] / 3600
-    return spatial_emiss
+    emiss_units = {
+        pol_name: (spatial_emiss[pol_name] * (cell_area / pol_mw / 3600)).astype(
+            "float32"
+        )
+        for pol_name, (_, pol_mw) in pol_ef_mw.items()
+    }
+    return spatial_emiss.assign(emiss_units)
 
 
 def transform_cmaq_units_point(
@@ -189,9 +244,11 @@ def transform_cmaq_units_point(
     Returns:
         Emitted species (not speciated) in CMAQ units.
     """
-    for pol_name, pol_mw in pol_mw.items():
-        spatial_emiss[pol_name] /= pol_mw * 3600  # g hr^-1 to mol s^-1
-    return spatial_emiss
+    emiss_units = {
+        pol_name: spatial_emiss[pol_name] / (mw * 3600)  # g hr^-1 to mol s^-1
+        for pol_name, mw in pol_mw.items()
+    }
+    return spatial_emiss.assign(emiss_units)
 
 
 def speciate_cmaq(
@@ -215,11 +272,9 @@ def speciate_cmaq(
     Returns:
         Speciated emission in CMAQ units.
     """
-    speciated_cmaq = speciate_emission(
-        spatial_emiss_units, voc_name, voc_species, cell_area
+    return speciate_emission_batch(
+        spatial_emiss_units, {voc_name: voc_species, pm_name: pm_species}, cell_area
     )
-    speciated_cmaq = speciate_emission(speciated_cmaq, pm_name, pm_species, cell_area)
-    return speciated_cmaq
 
 
 def add_cmaq_emission_attrs(
@@ -241,32 +296,41 @@ def add_cmaq_emission_attrs(
     Returns:
         Speciated emissions with variables with attributes.
     """
+    mass_units = set(pm_species) | {pm_name, "IOLE", "VOC_INV", "NVOL"}
     for pol in speciated_cmaq.data_vars:
-        var_desc = "Model species " + pol
-        speciated_cmaq[pol].attrs["units"] = "moles/s"
-        if (pol == pm_name) or (pol in pm_species.keys()):
-            speciated_cmaq[pol].attrs["units"] = "g/s"
-        if pol in ["IOLE", "VOC_INV", "NVOL"]:
-            speciated_cmaq[pol].attrs["units"] = "g/s"
-        speciated_cmaq[pol].attrs["long_name"] = f"{pol:<16}"
-        speciated_cmaq[pol].attrs["var_desc"] = f"{var_desc:<80}"
+        attrs = speciated_cmaq[pol].attrs
+        attrs["units"] = "g/s" if pol in mass_units else "moles/s"
+        attrs["long_name"] = f"{pol:<16}"
+        attrs["var_desc"] = f"{'Model species ' + pol:<80}"
 
     return speciated_cmaq.drop_vars([voc_name, pm_name])
 
 
-def create_var_list_attrs(speciated_cmaq_attrs: xr.Dataset) -> list[str]:
+def create_var_list_attrs(speciated_cmaq_attrs: xr.Dataset) -> str:
     """Create a VAR list for global attributes.
 
     Args:
         speciated_cmaq_attrs: Speciated spatial distributed emissions with attributes.
 
     Returns:
-        List of emission species.
+        Emission species, each padded to 16 characters.
     """
-    var_list = [
+    return "".join(
         f"{pol:<16}" for pol in speciated_cmaq_attrs.data_vars if pol != "TFLAG"
-    ]
-    return "".join(var_list)
+    )
+
+
+@lru_cache(maxsize=8)
+def read_griddesc(griddesc_path: str):
+    """Read GRIDDESC file. It is read once per path.
+
+    Args:
+        griddesc_path: Location of GRIDDESC file.
+
+    Returns:
+        GRIDDESC file as PseudoNetCDF file.
+    """
+    return pnc.pncopen(griddesc_path, format="griddesc")
 
 
 def create_global_attrs(
@@ -281,19 +345,20 @@ def create_global_attrs(
     Returns:
         Global attributes of emission file.
     """
-    griddesc = pnc.pncopen(griddesc_path, format="griddesc")
+    griddesc = read_griddesc(griddesc_path)
     now_date = dt.datetime.now()
+    # The creation time is never repeated, keep it out of the julian cache
+    cdate = calculate_julian.__wrapped__(pd.Timestamp(now_date))
+    ctime = calculate_hhmmss(now_date)
 
     global_attrs = {}
-    global_attrs["IOAPI_VERSION"] = (
-        f"{'ioapi-3.2: $Id: init3.F90 98 2018-04-05 14:35:07Z coats $':<80}"
-    )
-    global_attrs["EXEC_ID"] = f"{'?' * 16:<80}"
+    global_attrs["IOAPI_VERSION"] = IOAPI_VERSION
+    global_attrs["EXEC_ID"] = EXEC_ID
     global_attrs["FTYPE"] = np.int32(1)
-    global_attrs["CDATE"] = calculate_julian(pd.to_datetime(now_date))
-    global_attrs["CTIME"] = int(f"{now_date.hour}{now_date.minute}{now_date.second}")
-    global_attrs["WDATE"] = calculate_julian(pd.to_datetime(now_date))
-    global_attrs["WTIME"] = int(f"{now_date.hour}{now_date.minute}{now_date.second}")
+    global_attrs["CDATE"] = cdate
+    global_attrs["CTIME"] = ctime
+    global_attrs["WDATE"] = cdate
+    global_attrs["WTIME"] = ctime
     global_attrs["SDATE"] = speciated_cmaq_attr.TFLAG.isel(TSTEP=0, VAR=0).values[0]
     global_attrs["STIME"] = 0
     global_attrs["TSTEP"] = 10000
@@ -318,7 +383,7 @@ def create_global_attrs(
     global_attrs["GDNAM"] = griddesc.GDNAM
     global_attrs["UPNAM"] = griddesc.UPNAM
     global_attrs["VAR-LIST"] = create_var_list_attrs(speciated_cmaq_attr)
-    global_attrs["FILEDESC"] = f"{'Merged emissions output file from Mrggrid':<80}"
+    global_attrs["FILEDESC"] = FILEDESC
     global_attrs["HISTORY"] = ""
 
     return global_attrs
@@ -349,24 +414,27 @@ def prepare_netcdf_cmaq(
     Returns:
         Speiciated dataset with CMAQ emission netcdf format.
     """
-    speciated_cmaq = add_cmaq_emission_attrs(
-        speciated_cmaq, voc_species, pm_species, pm_name, voc_name
+    speciated_cmaq = (
+        add_cmaq_emission_attrs(
+            speciated_cmaq, voc_species, pm_species, pm_name, voc_name
+        )
+        .drop_vars(["Time", "XLAT", "XLONG"])
+        .rename_dims({"Time": "TSTEP", "west_east": "COL", "south_north": "ROW"})
     )
-    speciated_cmaq = speciated_cmaq.rename_dims(
-        {"Time": "TSTEP", "west_east": "COL", "south_north": "ROW"}
-    )
-    speciated_cmaq = speciated_cmaq.drop_vars(["Time", "XLAT", "XLONG"])
-    speciated_cmaq = speciated_cmaq.expand_dims("LAY").transpose(
-        "TSTEP", "LAY", "ROW", "COL"
+    # Trim before adding LAY so the slice and transpose touch fewer cells.
+    ori_row, ori_col = speciated_cmaq.sizes["ROW"], speciated_cmaq.sizes["COL"]
+    speciated_cmaq = (
+        speciated_cmaq.isel(
+            ROW=slice(btrim + 1, ori_row - (btrim + 1)),
+            COL=slice(btrim + 1, ori_col - (btrim + 1)),
+        )
+        .expand_dims("LAY")
+        .transpose("TSTEP", "LAY", "ROW", "COL")
     )
+    if speciated_cmaq.chunks:
+        speciated_cmaq = speciated_cmaq.chunk({"TSTEP": 1, "ROW": -1, "COL": -1})
     n_vars = len(speciated_cmaq.data_vars)
     speciated_cmaq["TFLAG"] = create_tflag_variable(date, n_vars)
-
-    ori_row, ori_col = speciated_cmaq.sizes["ROW"], speciated_cmaq.sizes["COL"]
-    speciated_cmaq = speciated_cmaq.isel(
-        ROW=slice(btrim + 1, ori_row - (btrim + 1)),
-        COL=slice(btrim + 1, ori_col - (btrim + 1)),
-    )
     speciated_cmaq.attrs = create_global_attrs(speciated_cmaq, griddesc_path)
     return speciated_cmaq
 
@@ -385,18 +453,35 @@ def create_cmaq_file_name(cmaq_nc: xr.Dataset) -> str:
     return f"cmaq_emissions_{date}.nc"
 
 
-def save_cmaq_file(cmaq_nc: xr.Dataset, path: str = "../results/") -> None:
+def save_cmaq_file(
+    cmaq_nc: xr.Dataset,
+    path: str = "../results/",
+    nc_format: str = "NETCDF3_CLASSIC",
+) -> None:
     """Save CMAQ file.
 
+    Emission species are written as float32. NetCDF4 formats are also
+    compressed and chunked by time step and layer, the way CMAQ reads
+    emission files.
+
     Args:
         cmaq_nc: Speciated CMAQ emission dataset with the correct Netcdf format.
         path: Location to save the emission file.
+        nc_format: CMAQ emission netCDF file format.
 
     """
     check_create_savedir(path)
     file_name = f"{path}/{create_cmaq_file_name(cmaq_nc)}"
+    emiss_encoding = {"dtype": "float32"}
+    if nc_format.startswith("NETCDF4"):
+        chunksizes = (1, 1, cmaq_nc.sizes["ROW"], cmaq_nc.sizes["COL"])
+        emiss_encoding.update({"zlib": True, "complevel": 4, "chunksizes": chunksizes})
+    encoding = {pol: emiss_encoding for pol in cmaq_nc.data_vars if pol != "TFLAG"}
     cmaq_nc.to_netcdf(
-        file_name, unlimited_dims={"TSTEP": True}, format="NETCDF3_CLASSIC"
+        file_name,
+        encoding=encoding,
+        unlimited_dims={"TSTEP": True},
+        format=nc_format,
     )
 
 
@@ -409,14 +494,37 @@ def merge_cmaq_source_emiss(cmaq_sources_day: typing.Dict) -> xr.Dataset:
     Returns:
         CMAQ emission dataset with a source dimension.
     """
-    add_day_dimension = {
-        source: xr.concat(emiss.values(), pd.Index(emiss.keys(), name="day"))
-        for source, emiss in cmaq_sources_day.items()
-    }
-    day_source_dimension = xr.concat(
-        add_day_dimension.values(), pd.Index(add_day_dimension.keys(), name="source")
+    source_day = pd.MultiIndex.from_tuples(
+        [(source, day) for source, emiss in cmaq_sources_day.items() for day in emiss],
+        names=["source", "day"],
     )
-    return day_source_dimension
+    emiss_source_day = [
+        emiss_day for emiss in cmaq_sources_day.values() for emiss_day in emiss.values()
+    ]
+    day_source_dimension = xr.concat(emiss_source_day, dim="source_day").assign_coords(
+        xr.Coordinates.from_pandas_multiindex(source_day, "source_day")
+    )
+    return day_source_dimension.unstack("source_day").transpose("source", "day", ...)
+
+
+def update_tflag_day(sum_source: xr.Dataset, tflag_m: np.ndarray) -> xr.Dataset:
+    """Add TFLAG variable and SDATE attribute to one emission day.
+
+    Args:
+        sum_source: Emission of one day without TFLAG variable.
+        tflag_m: TFLAG matrix of the day.
+
+    Returns:
+        Emission of one day with correct TFLAG value.
+    """
+    sum_source["TFLAG"] = xr.DataArray(
+        data=tflag_m,
+        dims=("TSTEP", "VAR", "DATE-TIME"),
+        attrs=TFLAG_ATTRS.copy(),
+        name="TFLAG",
+    )
+    sum_source.attrs["SDATE"] = tflag_m[0, 0, 0]
+    return sum_source
 
 
 def sum_cmaq_sources(day_source_dimension: xr.Dataset) -> typing.Dict[str, xr.Dataset]:
@@ -426,13 +534,18 @@ def sum_cmaq_sources(day_source_dimension: xr.Dataset) -> typing.Dict[str, xr.Da
         day_source_dimension: CMAQ emission dataset with a source dimension.
 
     Returns:
-        Keys are days and values the sum emission of different sources.
+        Keys are days and values the sum emission of different sources
+        with correct TFLAG value.
     """
-    sum_sources = day_source_dimension.sum(dim="source", keep_attrs=True)
-    sum_sources_by_day = {
-        day: sum_sources.sel(day=day) for day in sum_sources.day.values
+    sum_sources = day_source_dimension.drop_vars("TFLAG").sum(
+        dim="source", keep_attrs=True
+    )
+    days = sum_sources.day.values
+    tflag_days = create_tflag_matrix_batch(days, len(sum_sources.data_vars))
+    return {
+        day: update_tflag_day(sum_sources.isel(day=i).drop_vars("day"), tflag)
+        for i, (day, tflag) in enumerate(zip(days, tflag_days))
     }
-    return sum_sources_by_day
 
 
 def update_tflag_sources(
@@ -440,6 +553,9 @@ def update_tflag_sources(
 ) -> typing.Dict[str, xr.Dataset]:
     """Update TFLAG variables of total emission from diferent sources.
 
+    sum_cmaq_sources already returns the correct TFLAG, this is kept
+    for emissions summed elsewhere. All days must have the same species.
+
     Args:
         sum_sources_by_day: Keys are days and values the sum emission of different sources.
 
@@ -448,10 +564,12 @@ def update_tflag_sources(
         with correct TFLAG value.
     """
     sum_sources_by_day = {
-        day: emis.drop_vars(["day", "TFLAG"])
+        day: emis.drop_vars(["day", "TFLAG"], errors="ignore")
         for day, emis in sum_sources_by_day.items()
     }
-    for day, sum_source in sum_sources_by_day.items():
-        sum_source["TFLAG"] = create_tflag_variable(day, len(sum_source.data_vars))
-        sum_source.attrs["SDATE"] = sum_source.TFLAG.isel(TSTEP=0, VAR=0).values[0]
-    return sum_sources_by_day
+    n_var = len(next(iter(sum_sources_by_day.values())).data_vars)
+    tflag_days = create_tflag_matrix_batch(list(sum_sources_by_day), n_var)
+    return {
+        day: update_tflag_day(emis, tflag_m)
+        for (day, emis), tflag_m in zip(sum_sources_by_day.items(), tflag_days)
+    }
@@ -5,16 +5,17 @@ This module provide functions to calculate emissions rates.
 
 The module contains the following functions:
     - `calculate_emission(number_source, use_intensity, pol_ef)` - Returns: the emission rate.
-    - `speciate_emission(spatio_temporal, pol_name, pol_species)` - Returns: speciated pollutant (VOC or PM).
-    - `ktn_year_to_mol_hr(spatial_emiss, pol_mw)` - Returns: emissions in mol hr^-1.
-    - `ktn_year_to_ug_seg(spatial_emiss)` - Returns: emissions in ug s^-1.
-    - `ktn_year_to_mol_seg(spatial_emiss, pol_mw)` - Returns: emissions in mol s^-1.
-    - `ktn_year_to_g_seg(spatial_emiss)` - Returns: emissions in g s^-1.
+    - `speciate_emission(spatio_temporal, pol_name, pol_species, cell_area)` - Returns: speciated pollutant (VOC or PM).
+    - `speciate_emission_batch(spatio_temporal, pol_species, cell_area)` - Returns: speciated pollutants (VOC and PM).
+    - `ktn_year_to_g_day(spatial_emiss)` - Returns: emissions in g day^-1.
 """
 
 import typing
+import numpy as np
 import xarray as xr
 
+G_DAY_PER_KTN_YEAR = 1e9 / 365
+
 
 def calculate_emission(
     number_source: int | float, use_intensity: float, pol_ef: float
@@ -49,9 +50,40 @@ def speciate_emission(
     Returns:
         Speciated emissions.
     """
-    for new_pol, pol_fraction in pol_species.items():
-        spatio_temporal[new_pol] = spatio_temporal[pol_name] * pol_fraction
-    return spatio_temporal
+    return speciate_emission_batch(spatio_temporal, {pol_name: pol_species}, cell_area)
+
+
+def speciate_emission_batch(
+    spatio_temporal: xr.Dataset,
+    pol_species: typing.Dict[str, typing.Dict[str, float]],
+    cell_area: int | float,
+) -> xr.Dataset:
+    """Speciate many pollutants emission (e.g. VOC and PM) at once.
+
+    Args:
+        spatio_temporal: Spatial distribution of pollutants to speciate.
+        pol_species: Keys are the pollutants to speciate and values are dicts
+            with the new species as keys and the fraction of the pollutant as values.
+        cell_area: Cell area of wrfinput.
+
+    Returns:
+        Speciated emissions.
+    """
+    speciated = {}
+    for pol_name, species in pol_species.items():
+        pol_emiss = spatio_temporal[pol_name]
+        # Float fractions, an integer emission dtype would round them to 0
+        fraction_dtype = np.result_type(pol_emiss.dtype, np.float32)
+        fractions = xr.DataArray(
+            np.fromiter(species.values(), fraction_dtype, len(species)),
+            dims="species",
+        )
+        # Species first, so each species is a contiguous block in memory.
+        species_emiss = fractions * pol_emiss
+        speciated.update(
+            {spc: species_emiss.isel(species=i) for i, spc in enumerate(species)}
+        )
+    return spatio_temporal.assign(speciated)
 
 
 def ktn_year_to_g_day(spatial_emiss: xr.DataArray) -> xr.DataArray:
@@ -65,5 +97,4 @@ def ktn_year_to_g_day(spatial_emiss: xr.DataArray) -> xr.DataArray:
 
     Returns: Total emission in g day^-1.
     """
-    convert_factor = 1e9 / 365
-    return spatial_emiss * convert_factor
+    return spatial_emiss * G_DAY_PER_KTN_YEAR
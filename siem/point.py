@@ -8,16 +8,21 @@ It contains the following functions:
     - `calculate_sum_points(point_src, wrf_grid)` - Returns: wrf_grid with sums of point sources emissions.
     - `create_emiss_point(point_src, wrf_grid)` - Returns: wrf_grid with sums of point sources emissions and cell with no emissions with 0.
     - `retrive_proj_from(geogrid_path)` - Returns: wrf domain projections.
+    - `create_latlon_transformer(wrf_crs)` - Returns: transformer from wrf domain projection to EPSG:4326.
     - `calculate_centroids(emiss_point, geo_path)` - Returns: total emissions of point sources in wrf grid cell centroids.
     - `point_emiss_to_xarray(emiss_point_proj)` - Returns: emissions in centroids in xr.Dataset.
-    - `read_point_sources(point_path, geo_path, sep, lat_name, lon_name)` - Returns: spatial distributed point sources emissions to use PointSources class.
+    - `read_point_sources(point_path, geo_path, sep, lat_name, lon_name, chunks)` - Returns: spatial distributed point sources emissions to use PointSources class.
 """
 
+import os
+import numpy as np
 import pandas as pd
 import geopandas as gpd
+import shapely
 import xarray as xr
 from siem.proxy import create_wrf_grid, configure_grid_spatial
 import pyproj
+from functools import lru_cache
 
 
 def create_gpd_from(
@@ -29,7 +34,9 @@ def create_gpd_from(
     """Read point emiss csv.
 
     Read .csv file with latitude and longitude of point sources,
-    each column is the total emissions in KTn/year.
+    each column is the total emissions in KTn/year. The file is parsed
+    with pyarrow when it is installed and supports sep, otherwise
+    with the pandas C engine.
 
     Args:
         point_src_path: Location of point source .csv file.
@@ -40,15 +47,21 @@ def create_gpd_from(
     Returns:
         Point sources and emissions in GeoDataFrame.
     """
-    point_sources = pd.read_csv(point_src_path, sep=sep)
-    point_sources = gpd.GeoDataFrame(
-        point_sources,
-        geometry=gpd.points_from_xy(point_sources[lon_name], point_sources[lat_name]),
+    try:
+        point_sources = pd.read_csv(point_src_path, sep=sep, engine="pyarrow")
+    except (ImportError, ValueError):
+        # pyarrow is missing or rejects sep (e.g., regex or whitespace)
+        point_sources = pd.read_csv(point_src_path, sep=sep)
+    geometry = shapely.points(
+        point_sources[lon_name].to_numpy(), point_sources[lat_name].to_numpy()
+    )
+    # pandas names an unnamed index column "Unnamed: 0", pyarrow leaves it ""
+    index_cols = ["Unnamed: 0", ""]
+    return gpd.GeoDataFrame(
+        point_sources.drop(columns=[*index_cols, lat_name, lon_name], errors="ignore"),
+        geometry=geometry,
         crs="EPSG:4326",
     )
-    if "Unnamed: 0" in point_sources.columns:
-        return point_sources.drop(["Unnamed: 0", lat_name, lon_name], axis=1)
-    return point_sources.drop([lat_name, lon_name], axis=1)
 
 
 def calculate_sum_points(
@@ -63,9 +76,13 @@ def calculate_sum_points(
     Returns:
         Sum of emission in each grid.
     """
-    point_in_grid = gpd.overlay(point_src, wrf_grid, how="intersection")
-    points_in_grid = point_in_grid.dissolve("ID", aggfunc="sum")
-    return points_in_grid.drop(["geometry"], axis=1)
+    grid_tree = shapely.STRtree(wrf_grid.geometry.values)
+    point_idx, cell_idx = grid_tree.query(
+        point_src.geometry.values, predicate="intersects"
+    )
+    point_in_grid = point_src.drop(columns="geometry").iloc[point_idx]
+    cell_id = pd.Index(wrf_grid["ID"].to_numpy()[cell_idx], name="ID")
+    return point_in_grid.groupby(cell_id).sum(numeric_only=True)
 
 
 def create_emiss_point(
@@ -84,43 +101,61 @@ def create_emiss_point(
         Complete grid with total emission in wrf domain grid.
     """
     points_in_grid = calculate_sum_points(point_src, wrf_grid)
-    return wrf_grid.join(points_in_grid).fillna(0)
+    emiss = np.zeros((len(wrf_grid), points_in_grid.shape[1]))
+    emiss[wrf_grid.index.get_indexer(points_in_grid.index)] = points_in_grid.to_numpy()
+    return wrf_grid.join(
+        pd.DataFrame(emiss, index=wrf_grid.index, columns=points_in_grid.columns)
+    )
 
 
 def retrive_proj_from(geogrid_path: str):
     """Extract projection of geo_em.d0x.nc file.
 
+    The projection is read once per file and modification time.
+
     Args:
         geogrid_path: Location of geo_em.d0x.nc file.
 
     Returns:
         Projection of geo_em.d0x.nc
     """
-    geo_ds = xr.open_dataset(geogrid_path)
+    return _retrive_proj_cached(geogrid_path, os.path.getmtime(geogrid_path))
+
+
+@lru_cache(maxsize=8)
+def _retrive_proj_cached(geogrid_path: str, mtime: float) -> pyproj.CRS:
+    """Extract projection of geo_em.d0x.nc file, cached by path and mtime."""
+    # Only global attributes are needed, skip CF decoding of variables
+    with xr.open_dataset(geogrid_path, decode_cf=False) as geo_ds:
+        geo_attrs = geo_ds.attrs
     a = 6370000.0
     b = 6370000.0
 
     lcc = pyproj.Proj(
         proj="lcc",
-        lat_1=geo_ds.TRUELAT1,
-        lat_2=geo_ds.TRUELAT2,
-        lat_0=geo_ds.MOAD_CEN_LAT,
-        lon_0=geo_ds.STAND_LON,
+        lat_1=geo_attrs["TRUELAT1"],
+        lat_2=geo_attrs["TRUELAT2"],
+        lat_0=geo_attrs["MOAD_CEN_LAT"],
+        lon_0=geo_attrs["STAND_LON"],
         a=a,
         b=b,
     )
     merc = pyproj.Proj(
-        proj="merc", lon_0=geo_ds.STAND_LON, lat_ts=geo_ds.TRUELAT1, a=a, b=b
+        proj="merc",
+        lon_0=geo_attrs["STAND_LON"],
+        lat_ts=geo_attrs["TRUELAT1"],
+        a=a,
+        b=b,
     )
     stere = pyproj.Proj(
         proj="stere",
-        lat_0=geo_ds.TRUELAT1,
-        lon_0=geo_ds.STAND_LON,
-        lat_ts=geo_ds.TRUELAT1,
+        lat_0=geo_attrs["TRUELAT1"],
+        lon_0=geo_attrs["STAND_LON"],
+        lat_ts=geo_attrs["TRUELAT1"],
         a=a,
         b=b,
     )
-    latlon = pyproj.Proj(proj="longlat", lon_0=geo_ds.STAND_LON, a=a, b=b)
+    latlon = pyproj.Proj(proj="longlat", lon_0=geo_attrs["STAND_LON"], a=a, b=b)
 
     proj_codes = {
         1: lcc,  # lambert
@@ -129,11 +164,24 @@ def retrive_proj_from(geogrid_path: str):
         6: latlon,  # latlon
     }
 
-    wrf_proj = proj_codes[geo_ds.MAP_PROJ]
+    wrf_proj = proj_codes[geo_attrs["MAP_PROJ"]]
     wrf_crs = pyproj.CRS.from_proj4(str(wrf_proj))
     return wrf_crs
 
 
+@lru_cache(maxsize=8)
+def create_latlon_transformer(wrf_crs: pyproj.CRS) -> pyproj.Transformer:
+    """Create transformer from wrf domain projection to longitude and latitude.
+
+    Args:
+        wrf_crs: Projection of geo_em.d0x.nc.
+
+    Returns:
+        Transformer to EPSG:4326 with x as longitude and y as latitude.
+    """
+    return pyproj.Transformer.from_crs(wrf_crs, "EPSG:4326", always_xy=True)
+
+
 def calculate_centroid(emiss_point: gpd.GeoDataFrame, geo_path: str) -> pd.DataFrame:
     """Calculate centroid of each WRF domain grid cell.
 
@@ -145,12 +193,14 @@ def calculate_centroid(emiss_point: gpd.GeoDataFrame, geo_path: str) -> pd.DataF
        A DataFrame with total emissions from point sources with cell centroid coordinates.
     """
     wrf_proj = retrive_proj_from(geo_path)
-    emiss_point_proj = emiss_point.to_crs(wrf_proj)
-    emiss_point_proj["centro"] = emiss_point_proj.centroid
-    emiss_point_proj["centro"] = emiss_point_proj.centroid.to_crs("EPSG:4326")
-    emiss_point_proj["x"] = emiss_point_proj.centro.x.round(4)
-    emiss_point_proj["y"] = emiss_point_proj.centro.y.round(4)
-    return emiss_point_proj.drop(["geometry", "centro", "ID"], axis=1)
+    centroid = shapely.centroid(emiss_point.geometry.to_crs(wrf_proj).values)
+    lon, lat = create_latlon_transformer(wrf_proj).transform(
+        shapely.get_x(centroid), shapely.get_y(centroid)
+    )
+    emiss_point_proj = pd.DataFrame(emiss_point.drop(columns=["geometry", "ID"]))
+    emiss_point_proj["x"] = np.round(lon, 4)
+    emiss_point_proj["y"] = np.round(lat, 4)
+    return emiss_point_proj
 
 
 def pol_column_to_xarray(
@@ -195,12 +245,18 @@ def point_emiss_to_xarray(
 
     Returns: Total emission in xr.Dataset.
     """
-    pol_names = emiss_point_proj.columns.to_list()
-    pol_names = [pol for pol in pol_names if pol not in ["x", "y"]]
-    emiss_point = [
-        pol_column_to_xarray(emiss_point_proj, pol, ncol, nrow) for pol in pol_names
-    ]
-    return xr.merge(emiss_point)
+    dims = ("south_north", "west_east")
+    pol_names = [pol for pol in emiss_point_proj.columns if pol not in ["x", "y"]]
+    return xr.Dataset(
+        {
+            pol: (dims, emiss_point_proj[pol].to_numpy().reshape(nrow, ncol))
+            for pol in pol_names
+        },
+        coords={
+            "XLAT": (dims, emiss_point_proj["y"].to_numpy().reshape(nrow, ncol)),
+            "XLONG": (dims, emiss_point_proj["x"].to_numpy().reshape(nrow, ncol)),
+        },
+    )
 
 
 def read_point_sources(
@@ -211,6 +267,7 @@ def read_point_sources(
     sep: str = "\t",
     lat_name: str = "LAT",
     lon_name: str = "LON",
+    chunks: dict | str | None = "auto",
 ) -> xr.Dataset:
     """
     Read point sources .csv file to produces a xr.Dataset.
@@ -221,16 +278,23 @@ def read_point_sources(
         sep: Column separator of point sources .csv file.
         lat_name: Latitude column name.
         lon_name: Longitude column name.
+        chunks: Dask chunks of the xr.Dataset, None to keep it in memory.
 
     Returns:
         Total emissions of point sources in each WRF domain cell xr.Dataset.
+        It is backed by dask arrays unless chunks is None, use .compute()
+        or chunks=None to get the in-memory xr.Dataset.
     """
     point_sources = create_gpd_from(point_path, sep, lat_name, lon_name)
     wrf_grid = create_wrf_grid(geo_path, save=False)
     wrf_grid = configure_grid_spatial(wrf_grid, point_sources)
-    # Ensure points inside domain
-    point_sources = gpd.clip(point_sources, wrf_grid)
+    # Cheap bounding box filter, calculate_sum_points drops the rest
+    minx, miny, maxx, maxy = wrf_grid.total_bounds
+    point_sources = point_sources.cx[minx:maxx, miny:maxy]
 
     emiss_in_grid = create_emiss_point(point_sources, wrf_grid)
     emiss_in_grid = calculate_centroid(emiss_in_grid, geo_path)
-    return point_emiss_to_xarray(emiss_in_grid, ncol, nrow)
+    point_emiss = point_emiss_to_xarray(emiss_in_grid, ncol, nrow)
+    if chunks:
+        point_emiss = point_emiss.chunk(chunks)
+    return point_emiss
@@ -8,20 +8,30 @@ It helps you to create the `spatial_proxy` to use in `EmissSource`.
 It contains the following functions:
     - `get_domain_extension(geo_em_path)` - Returns: wrf domain corners coordinates.
     - `get_highway_query(highway_types, add_links)` - Returns: query for download highways.
-    - `download_highways(geo_em_path, highway_types, add_links, save_path, file_name)` - Returns: highways in domain in graphml.
-    - `download_point_sources(geo_em_path, tags, save, save_path)` - Returns: amenities shapefile.
-    - `create_grid(geo_em)` - Return wrf grid shapefile.
-    - `create_wrf_grid(geo_em_path, save, save_path)` - Returns: wrf grid after read geo_em.d0X.
+    - `get_osm_cache_path(save_path, bbox, query, extension)` - Returns: location of cached OSM download.
+    - `download_highways(geo_em_path, highway_types, add_links, save_path, file_name, use_cache)` - Returns: highways in domain in graphml.
+    - `download_highways_features(geo_em_path, highway_types, add_links, save, save_path, file_name, use_cache, vector_format)` - Returns: highways in domain in GeoDataFrame.
+    - `download_point_sources(geo_em_path, tags, save, save_path, use_cache, vector_format)` - Returns: amenities shapefile.
+    - `save_vector(vector, path_base, vector_format)` - Returns: location of saved GeoParquet or other vector file.
+    - `create_grid(clat, clon)` - Return wrf grid shapefile.
+    - `create_wrf_grid(geo_em_path, save, save_path, vector_format)` - Returns: wrf grid after read geo_em.d0X.
     - `configure_grid_spatial(wrf_grid, proxy)` - Returns: wrf_grid with proxy CRS and cell ID column.
     - `calculate_points_grid(wrf_grid, proxy, to_pre, save_pre, file_name)` - Returns: number of amenities in eac wrf grid.
     - `load_osmx_to_gdfs(osmx_path)` - Returns: highways graphml into GeoDataFrame.
+    - `create_utm_transformer(crs)` - Returns: transformer from crs to UTM zone 33S.
+    - `project_to_utm(geometry, crs)` - Returns: geometries in UTM zone 33S.
     - `calculate_highway_grid(wrf_grid, proxy, to_pre, save_pre, file_name)` - Returns: sums of highways longitude inside each wrf grid cell.
 """
 
+import os
+import hashlib
 import osmnx as ox
-import xarray as xr
+import netCDF4
 import numpy as np
+import pyproj
 import shapely
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from siem.user import check_create_savedir
 import geopandas as gpd
 
@@ -35,14 +45,27 @@ def get_domain_extension(geo_em_path: str = "../data/geo_em.d02.nc") -> tuple:
     Returns:
         max latitude, min latitude, max longitude, and min longitude.
     """
-    geo = xr.open_dataset(geo_em_path)
-    xlat_c = geo.XLAT_C.isel(Time=0)
-    xlon_c = geo.XLONG_C.isel(Time=0)
-    north = xlat_c.max().values
-    south = xlat_c.min().values
-    east = xlon_c.max().values
-    west = xlon_c.min().values
-    return (north, south, east, west)
+    return _domain_extension_cached(geo_em_path, os.path.getmtime(geo_em_path))
+
+
+@lru_cache(maxsize=8)
+def _domain_extension_cached(geo_em_path: str, mtime: float) -> tuple:
+    """Extract wrf domain corners, cached by path and mtime.
+
+    Only the domain boundary is read, the extremes of the cell corners
+    coordinates are always on it.
+    """
+    with netCDF4.Dataset(geo_em_path) as geo:
+        xlat_c = _read_boundary(geo.variables["XLAT_C"])
+        xlon_c = _read_boundary(geo.variables["XLONG_C"])
+    return (xlat_c.max(), xlat_c.min(), xlon_c.max(), xlon_c.min())
+
+
+def _read_boundary(corner_var: netCDF4.Variable) -> np.ndarray:
+    """Read first and last rows and columns of the first time of corner_var."""
+    rows = corner_var[0, [0, -1], :]
+    cols = corner_var[0, :, [0, -1]]
+    return np.concatenate([np.ravel(rows), np.ravel(cols)])
 
 
 def get_highway_query(highway_types: list[str], add_links: bool = False) -> str:
@@ -58,15 +81,38 @@ def get_highway_query(highway_types: list[str], add_links: bool = False) -> str:
     Returns:
         The custom query to use OSMx.
     """
+    query_types = list(highway_types)
     if add_links:
-        highway_links = [f"{st}_link" for st in highway_types]
-        highway_types += highway_links
+        query_types += [f"{st}_link" for st in highway_types]
 
-    cf = "[" + '"highway"' + "~" + '"' + "|".join(highway_types) + '"' + "]"
+    cf = '["highway"~"' + "|".join(query_types) + '"]'
     print(f"The custom filter is:\n {cf}")
     return cf
 
 
+def get_osm_cache_path(
+    save_path: str, bbox: tuple, query: str | dict, extension: str
+) -> str:
+    """Location of a cached OSM download.
+
+    The file name is a hash of the domain corners and the OSM query.
+
+    Args:
+        save_path: Location to save downloaded OSM data.
+        bbox: north, south, east, and west of the domain.
+        query: Custom filter or tags used to download OSM data.
+        extension: Extension of the cached file.
+
+    Returns:
+        Location of the cached file inside save_path/cache.
+    """
+    if isinstance(query, dict):
+        query = sorted(query.items())
+    bbox = tuple(round(float(corner), 5) for corner in bbox)
+    key = hashlib.sha1(repr((bbox, query)).encode()).hexdigest()
+    return f"{save_path}/cache/{key}.{extension}"
+
+
 def download_highways(
     geo_em_path: str,
     highway_types: str,
@@ -74,6 +120,7 @@ def download_highways(
     save: bool = True,
     save_path: str = "../data/partial",
     file_name: str = "highway",
+    use_cache: bool = True,
 ):
     """Download highways types contain in WRF domains.
 
@@ -84,23 +131,93 @@ def download_highways(
         save: To save the file.
         save_bath: Location to save downloaded highways.
         file_name: Identifier of save file.
+        use_cache: Reuse highways already downloaded for the same domain
+            and query from save_path/cache.
 
     Returns:
         Highways in domain in graph.ml format.
     """
-    north, south, east, west = get_domain_extension(geo_em_path)
+    bbox = get_domain_extension(geo_em_path)
     custom_filter = get_highway_query(highway_types, add_links)
-    highways = ox.graph_from_bbox(
-        north, south, east, west, network_type="drive", custom_filter=custom_filter
-    )
+    cache_path = get_osm_cache_path(save_path, bbox, custom_filter, "graphml")
+    if use_cache and os.path.isfile(cache_path):
+        highways = ox.load_graphml(cache_path)
+    else:
+        highways = ox.graph_from_bbox(
+            *bbox, network_type="drive", custom_filter=custom_filter
+        )
+        if use_cache:
+            check_create_savedir(os.path.dirname(cache_path))
+            ox.save_graphml(highways, filepath=cache_path)
     if save:
         check_create_savedir(save_path)
         ox.save_graphml(highways, filepath=f"{save_path}/domain_{file_name}.graphml")
     return highways
 
 
+def download_highways_features(
+    geo_em_path: str,
+    highway_types: list[str],
+    add_links: bool = False,
+    save: bool = True,
+    save_path: str = "../data/partial",
+    file_name: str = "highway",
+    use_cache: bool = True,
+    vector_format: str = "parquet",
+) -> gpd.GeoDataFrame:
+    """Download highways types contain in WRF domains as features.
+
+    Unlike `download_highways`, it does not build the road network graph,
+    it is enough when only highways geometries and lengths are needed,
+    as in `calculate_highway_grid`.
+
+    Args:
+        geo_em_path: Location of geo_em.d0x file.
+        highway_types: List with the types of highways to download.
+        add_links: If highways type links need to be download.
+        save: To save the file.
+        save_path: Location to save downloaded highways.
+        file_name: Identifier of save file.
+        use_cache: Reuse highways already downloaded for the same domain
+            and query from save_path/cache.
+        vector_format: Format of saved file, parquet, gpkg, or shp.
+
+    Returns:
+        Highways in domain with their length in meters.
+    """
+    bbox = get_domain_extension(geo_em_path)
+    query_types = list(highway_types)
+    if add_links:
+        query_types += [f"{st}_link" for st in highway_types]
+    tags = {"highway": query_types}
+    cache_path = get_osm_cache_path(save_path, bbox, tags, "gpkg")
+    if use_cache and os.path.isfile(cache_path):
+        highways = gpd.read_file(cache_path)
+    else:
+        highways = ox.features_from_bbox(*bbox, tags=tags)
+        is_line = highways.geom_type.isin(["LineString", "MultiLineString"])
+        highways = highways.loc[is_line, ["highway", "geometry"]].reset_index(
+            drop=True
+        )
+        highways["length"] = shapely.length(
+            project_to_utm(highways.geometry.values, highways.crs)
+        )
+        if use_cache:
+            check_create_savedir(os.path.dirname(cache_path))
+            highways.to_file(cache_path, driver="GPKG")
+    if save:
+        check_create_savedir(save_path)
+        save_vector(highways, f"{save_path}/domain_{file_name}", vector_format)
+    return highways
+
+
 def download_point_sources(
-    geo_em_path: str, tags: dict, save: bool = True, save_path: str = "../data/partial"
+    geo_em_path: str,
+    tags: dict,
+    save: bool = True,
+    save_path: str = "../data/partial",
+    use_cache: bool = True,
+    vector_format: str = "parquet",
 ):
     """Download OSM amenities.
 
@@ -114,23 +231,64 @@ def download_point_sources(
             for pizza restaurant `tags={"cuisine": "pizza"}`
         save: To save the file.
         save_bath: Location to save downloaded amenities.
+        use_cache: Reuse amenities already downloaded for the same domain
+            and tags from save_path/cache.
+        vector_format: Format of saved file, parquet, gpkg, or shp.
 
     Returns:
         Point amenities in shapefile.
     """
-    north, south, east, west = get_domain_extension(geo_em_path)
-    point_sources = ox.features_from_bbox(north, south, east, west, tags=tags)
-    point_sources_shp = point_sources[["name", "geometry"]].centroid
+    bbox = get_domain_extension(geo_em_path)
+    cache_path = get_osm_cache_path(save_path, bbox, tags, "gpkg")
+    if use_cache and os.path.isfile(cache_path):
+        point_sources_shp = gpd.read_file(cache_path).geometry
+    else:
+        point_sources = ox.features_from_bbox(*bbox, tags=tags)
+        point_sources_shp = point_sources[["name", "geometry"]].centroid
+        if use_cache:
+            check_create_savedir(os.path.dirname(cache_path))
+            point_sources_shp.to_file(cache_path, driver="GPKG")
     print(f"Point sources: {len(point_sources_shp)}")
 
     if save:
         check_create_savedir(save_path)
         source_type = list(tags.values())[0]
-        point_sources_shp.to_file(f"{save_path}/point_source_{source_type}.shp")
+        save_vector(
+            gpd.GeoDataFrame(geometry=point_sources_shp),
+            f"{save_path}/point_source_{source_type}",
+            vector_format,
+        )
     return point_sources_shp
 
 
-def create_grid(geo_em: xr.Dataset) -> gpd.GeoDataFrame:
+def save_vector(
+    vector: gpd.GeoDataFrame, path_base: str, vector_format: str = "parquet"
+) -> str:
+    """Save GeoDataFrame in GeoParquet or other vector format.
+
+    GeoParquet needs pyarrow, when it is not installed the file is
+    saved as GeoPackage.
+
+    Args:
+        vector: GeoDataFrame to save.
+        path_base: Location and name of the file without extension.
+        vector_format: parquet, gpkg, or shp.
+
+    Returns:
+        Location of the saved file.
+    """
+    if vector_format == "parquet":
+        try:
+            vector.to_parquet(f"{path_base}.parquet", compression="zstd")
+            return f"{path_base}.parquet"
+        except ImportError:
+            print("pyarrow is not installed, saving as GeoPackage")
+            vector_format = "gpkg"
+    vector.to_file(f"{path_base}.{vector_format}")
+    return f"{path_base}.{vector_format}"
+
+
+def create_grid(clat: np.ndarray, clon: np.ndarray) -> gpd.GeoDataFrame:
     """Create grid from geo_em cell coordinates.
 
     Create grid based of geo_em.d0X.nc file. It is compatible with
@@ -140,28 +298,19 @@ def create_grid(geo_em: xr.Dataset) -> gpd.GeoDataFrame:
         <https://gis.stackexchange.com/questions/414617/creating-polygon-grid-from-point-grid-using-geopandas>.
 
     Args:
-    geo_em: WRF geo_em.d0x.nc file
+        clat: Latitude of cell corners (XLAT_C) of the first time.
+        clon: Longitude of cell corners (XLONG_C) of the first time.
 
     Returns:
         WRF domain grid in GeoDataFrame format.
     """
-    clat = geo_em.XLAT_C.sel(Time=0).values
-    clon = geo_em.XLONG_C.sel(Time=0).values
-
-    nrow = geo_em.sizes["south_north"]
-    ncol = geo_em.sizes["west_east"]
-
-    n = nrow * ncol
-
     left = lower = slice(None, -1)
     upper = right = slice(1, None)
     corners = [[lower, left], [lower, right], [upper, right], [upper, left]]
 
-    xy = np.empty((n, 4, 2))
-
-    for i, (rows, cols) in enumerate(corners):
-        xy[:, i, 0] = clon[rows, cols].ravel()
-        xy[:, i, 1] = clat[rows, cols].ravel()
+    xs = np.stack([clon[rows, cols].ravel() for rows, cols in corners], axis=1)
+    ys = np.stack([clat[rows, cols].ravel() for rows, cols in corners], axis=1)
+    xy = np.stack([xs, ys], axis=-1)
 
     grid_geometry = shapely.creation.polygons(xy)
     grid_wrf = gpd.GeoDataFrame(geometry=grid_geometry)
@@ -169,7 +318,10 @@ def create_grid(geo_em: xr.Dataset) -> gpd.GeoDataFrame:
 
 
 def create_wrf_grid(
-    geo_em_path: str, save: bool = True, save_path: str = "../data/partial"
+    geo_em_path: str,
+    save: bool = True,
+    save_path: str = "../data/partial",
+    vector_format: str = "parquet",
 ) -> gpd.GeoDataFrame:
     """Create WRF domain grid.
 
@@ -177,16 +329,20 @@ def create_wrf_grid(
         geo_em_path: Location of geo_em.d0X.nc file.
         save: If grid needs to be saved.
         save_path: Location to save wrf grid.
+        vector_format: Format of saved grid, parquet, gpkg, or shp.
 
     Returns:
         wrfinput grid to safe.
     """
-    with xr.open_dataset(geo_em_path) as geo:
-        wrf_grid = create_grid(geo)
+    with netCDF4.Dataset(geo_em_path) as geo:
+        geo.set_auto_mask(False)
+        clat = geo.variables["XLAT_C"][0]
+        clon = geo.variables["XLONG_C"][0]
         grid_id = geo.grid_id
+    wrf_grid = create_grid(clat, clon)
     if save:
         check_create_savedir(save_path)
-        wrf_grid.to_file(f"{save_path}/wrf_grid_d{grid_id}.shp")
+        save_vector(wrf_grid, f"{save_path}/wrf_grid_d{grid_id}", vector_format)
     return wrf_grid
 
 
@@ -206,7 +362,7 @@ def configure_grid_spatial(
         wrf_grid with same CRS as proxy and with column ID.
     """
     wrf_grid = wrf_grid.set_crs(proxy.crs)
-    wrf_grid["ID"] = range(0, len(wrf_grid))
+    wrf_grid["ID"] = np.arange(len(wrf_grid), dtype=np.int32)
     return wrf_grid
 
 
@@ -230,22 +386,23 @@ def calculate_points_grid(
        Number of points in each cell grid.
     """
     wrf_grid_ready = configure_grid_spatial(wrf_grid, proxy)
-    proxy_in_grid = gpd.clip(proxy, wrf_grid_ready)
-    # From:
-    # https://stackoverflow.com/questions/69644523/count-points-in-polygon-and-write-result-to-geodataframe
-    points_in_grid = (
-        wrf_grid_ready.sjoin(proxy_in_grid)
-        .groupby("ID")
-        .count()
-        .geometry.rename("n_sources")
-    )
-    points_in_dom = wrf_grid.join(points_in_grid).fillna(0)
+    grid_tree = shapely.STRtree(wrf_grid_ready.geometry.values)
+    _, cell_idx = grid_tree.query(proxy.geometry.values, predicate="intersects")
+    n_sources = np.bincount(cell_idx, minlength=len(wrf_grid_ready))
+    points_in_dom = wrf_grid.assign(n_sources=n_sources.astype(np.int32))
     if to_pre:
         check_create_savedir(save_pre)
-        points_in_dom["x"] = points_in_dom.centroid.geometry.x
-        points_in_dom["y"] = points_in_dom.centroid.geometry.y
+        centroid = shapely.get_coordinates(
+            shapely.centroid(points_in_dom.geometry.values)
+        )
+        points_in_dom["x"] = centroid[:, 0]
+        points_in_dom["y"] = centroid[:, 1]
         points_in_dom[["x", "y", "n_sources"]].to_csv(
-            f"{save_pre}/points_{file_name}.csv", sep=" ", header=False
+            f"{save_pre}/points_{file_name}.csv",
+            sep=" ",
+            header=False,
+            float_format="%.6f",
+            lineterminator="\n",
         )
     return points_in_dom
 
@@ -263,6 +420,35 @@ def load_osmx_to_gdfs(osmx_path: str) -> gpd.GeoDataFrame:
     return ox.graph_to_gdfs(sp, nodes=False, edges=True)
 
 
+@lru_cache(maxsize=8)
+def create_utm_transformer(crs: pyproj.CRS) -> pyproj.Transformer:
+    """Create transformer from crs to UTM zone 33S (EPSG:32733).
+
+    Args:
+        crs: Projection of highways.
+
+    Returns:
+        Transformer to EPSG:32733 with x as easting and y as northing.
+    """
+    return pyproj.Transformer.from_crs(crs, "EPSG:32733", always_xy=True)
+
+
+def project_to_utm(geometry: np.ndarray, crs: pyproj.CRS) -> np.ndarray:
+    """Project geometries to UTM zone 33S (EPSG:32733).
+
+    Args:
+        geometry: Geometries in crs.
+        crs: Projection of geometry.
+
+    Returns:
+        Geometries in EPSG:32733.
+    """
+    to_utm = create_utm_transformer(crs)
+    return shapely.transform(
+        geometry, lambda xy: np.column_stack(to_utm.transform(xy[:, 0], xy[:, 1]))
+    )
+
+
 def calculate_highway_grid(
     wrf_grid: gpd.GeoDataFrame,
     proxy: gpd.GeoDataFrame,
@@ -274,6 +460,8 @@ def calculate_highway_grid(
 
     Calculate sum of highways longitude inside WRF grid cell.
     This will produce a proxy for spatially distribute vehicular emissions.
+    Highways overlapping inside a cell (e.g., two way highways) are
+    counted once.
 
     Args:
         wrf_grid: WRF domain grid.
@@ -287,19 +475,54 @@ def calculate_highway_grid(
     """
     wrf_grid_ready = configure_grid_spatial(wrf_grid, proxy)
 
-    highway = proxy[["highway", "length", "geometry"]]
-    highway = gpd.clip(highway, wrf_grid_ready)
-    highway_grid = gpd.overlay(highway, wrf_grid_ready, how="intersection")
-    highway_grid = highway_grid.dissolve("ID")
-    highway_grid["longKm"] = highway_grid.geometry.to_crs("EPSG:32733").length / 1000
+    highway_geom = np.asarray(proxy.geometry.values)
+    cell_geom = np.asarray(wrf_grid_ready.geometry.values)
+    grid_tree = shapely.STRtree(cell_geom)
+    highway_idx, cell_idx = grid_tree.query(highway_geom, predicate="intersects")
+
+    # Highways inside a single cell are their own intersection
+    shapely.prepare(cell_geom)
+    highway_cell = highway_geom[highway_idx]
+    crossing = ~shapely.contains_properly(cell_geom[cell_idx], highway_cell)
+
+    # GEOS releases the GIL, so chunks of pairs intersect in parallel
+    n_workers = max(1, min(crossing.sum(), os.cpu_count() or 1))
+    highway_chunks = np.array_split(highway_cell[crossing], n_workers)
+    cell_chunks = np.array_split(cell_geom[cell_idx[crossing]], n_workers)
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        highway_cell[crossing] = np.concatenate(
+            list(executor.map(shapely.intersection, highway_chunks, cell_chunks))
+        )
+    # Union the pieces of each cell, so two way highways and overlapping
+    # segments are counted once
+    order = np.argsort(cell_idx, kind="stable")
+    cell_pieces = highway_cell[order]
+    cells, starts, counts = np.unique(
+        cell_idx[order], return_index=True, return_counts=True
+    )
+    cell_highways = cell_pieces[starts]
+    for i in np.flatnonzero(counts > 1):
+        cell_highways[i] = shapely.union_all(
+            cell_pieces[starts[i] : starts[i] + counts[i]]
+        )
+    highway_utm = project_to_utm(cell_highways, proxy.crs)
+    long_km = np.zeros(len(wrf_grid_ready))
+    long_km[cells] = shapely.length(highway_utm) / 1000
 
-    highway_dom = wrf_grid.join(highway_grid[["longKm"]]).fillna(0)
+    highway_dom = wrf_grid.assign(longKm=long_km.astype(np.float32))
 
     if to_pre:
         check_create_savedir(save_pre)
-        highway_dom["x"] = highway_dom.geometry.centroid.x
-        highway_dom["y"] = highway_dom.geometry.centroid.y
+        centroid = shapely.get_coordinates(
+            shapely.centroid(highway_dom.geometry.values)
+        )
+        highway_dom["x"] = centroid[:, 0]
+        highway_dom["y"] = centroid[:, 1]
         highway_dom[["x", "y", "longKm"]].to_csv(
-            f"{save_pre}/highways_{file_name}.csv", sep=" ", header=False
+            f"{save_pre}/highways_{file_name}.csv",
+            sep=" ",
+            header=False,
+            float_format="%.6f",
+            lineterminator="\n",
         )
     return highway_dom
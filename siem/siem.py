@@ -9,14 +9,29 @@ This modules defined the classes used by siem to create this emissions files:
     - `GroupSources` - Class to group EmissionSources and PointSources, useful to create one emission file.
 """
 
+import os
 import typing
+import weakref
+import numpy as np
 import pandas as pd
 import xarray as xr
-import siem.spatial as spt
 import siem.temporal as temp
 import siem.emiss as em
 import siem.wrfchemi as wemi
 import siem.cmaq as cmaq
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _NormalizedProxy:
+    """Spatial proxy divided by its total, tied to the proxy it came from."""
+
+    __slots__ = ("proxy", "normalized", "__weakref__")
+
+    def __init__(self, proxy: xr.DataArray):
+        self.proxy = proxy
+        self.normalized = proxy / proxy.sum()
+        self.normalized.values.flags.writeable = False
 
 
 class EmissionSource:
@@ -30,12 +45,21 @@ class EmissionSource:
         number: Number of Sources.
         use_intensity: Use intensity
         pol_ef: Pollutant emission factors and molecular weight.
+        pol_names: Pollutants in pol_ef.
+        ef_vec: Emission factors of pol_names.
+        mw_vec: Molecular weights of pol_names.
         spatial_proxy: Spatial proxy to spatial distribute emissions.
         temporal_prof: Temporal profile to temporal distribute emissions.
+        cmaq_temporal_prof: temporal_prof with 25 hours for CMAQ.
         voc_spc: VOC species to speciate with their fraction.
         pm_spc: PM species to speciate with their fraction.
+        normalized_proxy: Spatial proxy divided by its total.
     """
 
+    # Sources built on the same proxy (e.g. vehicles sharing a street
+    # network) normalize it once. Entries live while a source uses them.
+    _NORM_CACHE = weakref.WeakValueDictionary()
+
     def __init__(
         self,
         name: str,
@@ -69,6 +93,78 @@ class EmissionSource:
         self.voc_spc = voc_spc
         self.pm_spc = pm_spc
 
+    @property
+    def number(self) -> int | float:
+        """Number of sources."""
+        return self._number
+
+    @number.setter
+    def number(self, number: int | float) -> None:
+        self._number = number
+        self._st_cache = {}
+
+    @property
+    def use_intensity(self) -> float:
+        """Emission source activity rate."""
+        return self._use_intensity
+
+    @use_intensity.setter
+    def use_intensity(self, use_intensity: float) -> None:
+        self._use_intensity = use_intensity
+        self._st_cache = {}
+
+    @property
+    def spatial_proxy(self) -> xr.DataArray:
+        """Proxy to spatially distribute emissions."""
+        return self._spatial_proxy
+
+    @spatial_proxy.setter
+    def spatial_proxy(self, spatial_proxy: xr.DataArray) -> None:
+        self._spatial_proxy = spatial_proxy
+        self._st_cache = {}
+
+    @property
+    def temporal_prof(self) -> np.ndarray:
+        """Hourly fractions to temporally distribute emissions, read-only."""
+        return self._temporal_prof
+
+    @temporal_prof.setter
+    def temporal_prof(self, temporal_prof: list[float]) -> None:
+        # Read-only copy, so in-place edits cannot leave derived profiles stale
+        self._temporal_prof = np.array(temporal_prof, dtype="float64")
+        self._temporal_prof.setflags(write=False)
+        self.cmaq_temporal_prof = cmaq.to_25hr_profile(self._temporal_prof)
+        self._st_cache = {}
+
+    @property
+    def pol_ef(self) -> MappingProxyType:
+        """Pollutant emission factors and molecular weight.
+
+        It is read-only, assign a new dict to change the emission factors.
+        """
+        return MappingProxyType(self._pol_ef)
+
+    @pol_ef.setter
+    def pol_ef(self, pol_ef: dict) -> None:
+        self._pol_ef = dict(pol_ef)
+        self._st_cache = {}
+        self.pol_names = list(pol_ef.keys())
+        self.ef_vec = np.array([ef for ef, _ in pol_ef.values()], dtype="float64")
+        self.mw_vec = np.array([mw for _, mw in pol_ef.values()], dtype="float64")
+
+    @property
+    def normalized_proxy(self) -> xr.DataArray:
+        """Spatial proxy divided by its total, shared between sources."""
+        norm = getattr(self, "_norm", None)
+        if norm is None or norm.proxy is not self.spatial_proxy:
+            key = id(self.spatial_proxy)
+            norm = self._NORM_CACHE.get(key)
+            if norm is None:
+                norm = _NormalizedProxy(self.spatial_proxy)
+                self._NORM_CACHE[key] = norm
+            self._norm = norm
+        return norm.normalized
+
     def __str__(self):
         """Print summary of EmissionSource attributes.
 
@@ -112,13 +208,12 @@ class EmissionSource:
             A table with pollutants as index and total emissions
             as columns.
         """
-        total_emission = {
-            pol: self.total_emission(pol, ktn_year=True) for pol in self.pol_ef.keys()
-        }
-        total_emission = pd.DataFrame.from_dict(
-            total_emission, orient="index", columns=["total_emiss"]
+        total_emiss = em.calculate_emission(
+            self.number, self.use_intensity, self.ef_vec
+        )
+        return pd.DataFrame(
+            {"total_emiss": total_emiss * 365 / 10**9}, index=self.pol_names
         )
-        return total_emission
 
     def spatial_emission(self, pol_name: str, cell_area: int | float) -> xr.DataArray:
         """Distribute one pollutant.
@@ -130,44 +225,85 @@ class EmissionSource:
         Returns:
             Spatially distributed emissions.
         """
-        return spt.distribute_spatial_emission(
-            self.spatial_proxy,
-            self.number,
-            cell_area,
-            self.use_intensity,
-            self.pol_ef[pol_name][0],
-            pol_name,
+        density_map = self.normalized_proxy * (self.number / cell_area)
+        spatial_emission = em.calculate_emission(
+            density_map, self.use_intensity, self.pol_ef[pol_name][0]
         )
+        spatial_emission.name = pol_name
+        return spatial_emission
 
     def spatiotemporal_emission(
-        self, pol_names: str | list[str], cell_area: int | float, is_cmaq: bool = False
+        self,
+        pol_names: str | list[str],
+        cell_area: int | float,
+        is_cmaq: bool = False,
+        chunks: dict | None = None,
     ) -> xr.DataArray:
         """Spatial and temporal distribution of emissions.
 
+        The last result is cached until number, use_intensity, pol_ef,
+        spatial_proxy or temporal_prof are reassigned, or clear_cache is
+        called. Each call returns a shallow copy sharing the cached
+        read-only arrays.
+
         Args:
             pol_names: Name or names of pollutants to distribute.
             cell_area: Wrfinput cell area.
             is_cmaq: If it will be used for CMAQ.
+            chunks: Dask chunks of spatial_proxy (e.g., {"south_north": 256}),
+                to distribute emissions lazily in large domains.
 
         Returns:
             Spatial and temporal emission distribution.
         """
         if isinstance(pol_names, str):
             pol_names = [pol_names]
+        pol_names = list(pol_names)
 
-        spatial_emissions = {
-            pol: self.spatial_emission(pol, cell_area) for pol in pol_names
-        }
+        key = (tuple(pol_names), float(cell_area), is_cmaq, repr(chunks))
+        if key not in self._st_cache:
+            # Keep only the last result, each one is a full (pol, Time, y, x) cube
+            spatio_temporal = self._spatiotemporal_emission(
+                pol_names, cell_area, is_cmaq, chunks
+            )
+            self._st_cache = {key: spatio_temporal}
+        return self._st_cache[key].copy(deep=False)
 
-        temp_prof = self.temporal_prof
-        if is_cmaq:
-            temp_prof = cmaq.to_25hr_profile(self.temporal_prof)
+    def clear_cache(self) -> None:
+        """Drop the cached spatiotemporal emission to free its memory."""
+        self._st_cache = {}
 
-        spatio_temporal = {
-            pol: temp.split_by_time(spatial, temp_prof)
-            for pol, spatial in spatial_emissions.items()
-        }
-        return xr.merge(spatio_temporal.values())
+    def _spatiotemporal_emission(
+        self,
+        pol_names: list[str],
+        cell_area: int | float,
+        is_cmaq: bool,
+        chunks: dict | None,
+    ) -> xr.Dataset:
+        """Compute spatiotemporal_emission without the cache."""
+        temp_prof = self.cmaq_temporal_prof if is_cmaq else self.temporal_prof
+
+        proxy = self.normalized_proxy
+        pol_ef = self.ef_vec[[self.pol_names.index(pol) for pol in pol_names]]
+        scale = self.number * self.use_intensity / float(cell_area)
+        if chunks:
+            time_prof = xr.DataArray(
+                temp_prof, dims="Time", coords={"Time": np.arange(len(temp_prof))}
+            )
+            proxy_time = time_prof * proxy.chunk(chunks)
+            return xr.Dataset(
+                {pol: proxy_time * ef for pol, ef in zip(pol_names, pol_ef * scale)}
+            )
+        # emiss[pol, Time, y, x] = scale * ef[pol] * temp_prof[Time] * proxy[y, x]
+        emiss = np.einsum(
+            "p,t,ji->ptji", pol_ef * scale, temp_prof, proxy.values, optimize=True
+        )
+        emiss.flags.writeable = False
+        dims = ("Time", *proxy.dims)
+        return xr.Dataset(
+            {pol: (dims, pol_emiss) for pol, pol_emiss in zip(pol_names, emiss)},
+            coords={**proxy.coords, "Time": np.arange(len(temp_prof))},
+        )
 
     def speciate_emission(
         self,
@@ -216,13 +352,9 @@ class EmissionSource:
         spatio_temporal = self.spatiotemporal_emission(
             self.pol_ef.keys(), cell_area, is_cmaq
         )
-        speciated_emiss = em.speciate_emission(
-            spatio_temporal, voc_name, self.voc_spc, cell_area
+        return em.speciate_emission_batch(
+            spatio_temporal, {voc_name: self.voc_spc, pm_name: self.pm_spc}, cell_area
         )
-        speciated_emiss = em.speciate_emission(
-            speciated_emiss, pm_name, self.pm_spc, cell_area
-        )
-        return speciated_emiss
 
     def to_wrfchemi(
         self,
@@ -235,6 +367,7 @@ class EmissionSource:
         write_netcdf: bool = False,
         nc_format: str = "NETCDF3_64BIT",
         path: str = "../results",
+        chunks: dict | None = None,
     ) -> xr.Dataset:
         """Create WRF-Chem emission file (wrfchemi).
 
@@ -248,12 +381,15 @@ class EmissionSource:
             write_netcdf: Write the NetCDF file.
             nc_format: wrfchemi NetCDF file format.
             path: Location to save wrfchemi.
+            chunks: Dask chunks of spatial_proxy to build wrfchemi lazily.
 
         Returns:
             Dataset with wrfchemi netCDF format.
         """
         cell_area = (wrfinput.DX / 1000) ** 2
-        spatio_temporal = self.spatiotemporal_emission(self.pol_ef.keys(), cell_area)
+        spatio_temporal = self.spatiotemporal_emission(
+            self.pol_ef.keys(), cell_area, chunks=chunks
+        )
         if len(week_profile) == 7:
             spatio_temporal = temp.split_by_weekday(
                 spatio_temporal, week_profile, start_date, end_date
@@ -290,6 +426,8 @@ class EmissionSource:
         voc_name: str = "VOC",
         write_netcdf: bool = False,
         path: str = "../results",
+        nc_format: str = "NETCDF3_CLASSIC",
+        chunks: dict | None = None,
     ) -> typing.Dict[str, xr.Dataset]:
         """Create CMAQ emission file.
 
@@ -304,6 +442,8 @@ class EmissionSource:
             voc_name: VOC name in pol_ef keys.
             write_netcdf: Write the netCDF file.
             path: Location to save CMAQ emission file.
+            nc_format: CMAQ emission netCDF file format.
+            chunks: Dask chunks of spatial_proxy to build emissions lazily.
 
         Returns:
             Keys are simulation days and values the emission file for CMAQ
@@ -311,7 +451,7 @@ class EmissionSource:
         """
         cell_area = (wrfinput.DX / 1000) ** 2
         spatio_temporal = self.spatiotemporal_emission(
-            self.pol_ef.keys(), cell_area, is_cmaq=True
+            self.pol_ef.keys(), cell_area, is_cmaq=True, chunks=chunks
         )
         spatio_temporal_units = cmaq.transform_cmaq_units(
             spatio_temporal, self.pol_ef, cell_area
@@ -320,16 +460,16 @@ class EmissionSource:
             spatio_temporal_units, self.voc_spc, self.pm_spc, cell_area
         )
 
-        # TODO: Change it to a function
-        for emi in speciated_emiss.data_vars:
-            speciated_emiss[emi] = speciated_emiss[emi].astype("float32")
-
         days_factor = temp.assign_factor_simulation_days(
             start_date, end_date, week_profile, is_cmaq=True
         )
+        # Days share at most seven week factors, scale once per factor
+        speciated_by_fact = {
+            fact: speciated_emiss * fact for fact in days_factor.frac.unique()
+        }
         cmaq_files = {
             day: cmaq.prepare_netcdf_cmaq(
-                speciated_emiss * fact,
+                speciated_by_fact[fact],
                 day,
                 griddesc_path,
                 btrim,
@@ -340,7 +480,7 @@ class EmissionSource:
         }
         if write_netcdf:
             for cmaq_nc in cmaq_files.values():
-                cmaq.save_cmaq_file(cmaq_nc, path)
+                cmaq.save_cmaq_file(cmaq_nc, path, nc_format)
         return cmaq_files
 
 
@@ -357,6 +497,7 @@ class PointSources:
         spatial_emission : Spatially distributed emissions in simulation domain.
         pol_emiss : Names of considered pollutants (columns).
         temporal_prof : Temporal profile to temporal emission distribution.
+        cmaq_temporal_prof : temporal_prof with 25 hours for CMAQ.
         voc_spc : VOC speciation dict. Keys are VOC species, values are fractions.
         pm_spc : PM speciation dict. Keys are PM species, values are fractions.
     """
@@ -389,6 +530,18 @@ class PointSources:
         self.voc_spc = voc_spc
         self.pm_spc = pm_spc
 
+    @property
+    def temporal_prof(self) -> np.ndarray:
+        """Hourly fractions to temporally distribute emissions, read-only."""
+        return self._temporal_prof
+
+    @temporal_prof.setter
+    def temporal_prof(self, temporal_prof: list[float]) -> None:
+        # Read-only copy, so in-place edits cannot leave derived profiles stale
+        self._temporal_prof = np.array(temporal_prof, dtype="float64")
+        self._temporal_prof.setflags(write=False)
+        self.cmaq_temporal_prof = cmaq.to_25hr_profile(self._temporal_prof)
+
     def __str__(self):
         """Print summary of PointSource attributes.
 
@@ -426,13 +579,9 @@ class PointSources:
             A table with pollutants as index and total emissions
             as columns.
         """
-        total_emission = {
-            pol: self.total_emission(pol) for pol in self.pol_emiss.keys()
-        }
-        total_emission = pd.DataFrame.from_dict(
-            total_emission, orient="index", columns=["total_emiss"]
-        )
-        return total_emission
+        pol_names = list(self.pol_emiss.keys())
+        total_emiss = self.spatial_emission[pol_names].sum().to_array()
+        return pd.DataFrame({"total_emiss": total_emiss.values}, index=pol_names)
 
     def to_wrfchemi(
         self,
@@ -473,7 +622,11 @@ class PointSources:
                 point_spc_time, week_profile, start_date, end_date
             )
         point_speciated = wemi.speciate_wrfchemi(
-            point_spc_time, self.voc_spc, self.pm_spc, cell_area, wrfinput
+            point_spc_time.astype("float32"),
+            self.voc_spc,
+            self.pm_spc,
+            cell_area,
+            wrfinput,
         )
         wrfchemi_netcdf = wemi.prepare_wrfchemi_netcdf(
             point_speciated, wrfinput, start_date
@@ -494,6 +647,7 @@ class PointSources:
         voc_name: str = "VOC",
         write_netcdf: bool = False,
         path: str = "../results",
+        nc_format: str = "NETCDF3_CLASSIC",
     ) -> typing.Dict[str, xr.Dataset]:
         """Create CMAQ emission file.
 
@@ -510,33 +664,35 @@ class PointSources:
             voc_name: VOC name in pol_emiss.
             write_netcdf: Save CMAQ emission file.
             path: Location to save CMAQ emission file.
+            nc_format: CMAQ emission netCDF file format.
         Returns:
             Keys are simulation day.
             Values are Daset in CMAQ emission file netcdf format.
         """
         cell_area = (wrfinput.DX / 1000) ** 2
         point_gd = em.ktn_year_to_g_day(self.spatial_emission)  # g day^-1
-        cmaq_temp_prof = cmaq.to_25hr_profile(self.temporal_prof)
         point_time = temp.split_by_time_from(
             point_gd,  # g hr^-1
-            cmaq_temp_prof,
+            self.cmaq_temporal_prof,
         )
 
         point_time_units = cmaq.transform_cmaq_units_point(
             point_time, self.pol_emiss, pm_name
-        )
+        ).astype("float32")
         speciated_emiss = cmaq.speciate_cmaq(
             point_time_units, self.voc_spc, self.pm_spc, cell_area
         )
-        for emi in speciated_emiss.data_vars:
-            speciated_emiss[emi] = speciated_emiss[emi].astype("float32")
 
         days_factor = temp.assign_factor_simulation_days(
             start_date, end_date, week_profile, is_cmaq=True
         )
+        # Days share at most seven week factors, scale once per factor
+        speciated_by_fact = {
+            fact: speciated_emiss * fact for fact in days_factor.frac.unique()
+        }
         cmaq_files = {
             day: cmaq.prepare_netcdf_cmaq(
-                speciated_emiss * fact,
+                speciated_by_fact[fact],
                 day,
                 griddesc_path,
                 btrim,
@@ -547,7 +703,7 @@ class PointSources:
         }
         if write_netcdf:
             for cmaq_nc in cmaq_files.values():
-                cmaq.save_cmaq_file(cmaq_nc, path)
+                cmaq.save_cmaq_file(cmaq_nc, path, nc_format)
         return cmaq_files
 
 
@@ -627,8 +783,9 @@ class GroupSources:
         Returns:
             Emission file in WRF-Chem wrfchemi netCDF format.
         """
-        wrfchemis = {
-            source: emiss.to_wrfchemi(
+
+        def source_to_wrfchemi(emiss: EmissionSource | PointSources) -> xr.Dataset:
+            wrfchemi = emiss.to_wrfchemi(
                 wrfinput,
                 start_date,
                 end_date,
@@ -637,19 +794,44 @@ class GroupSources:
                 voc_name,
                 write_netcdf=False,
             )
-            for source, emiss in self.sources.items()
-        }
-        wrfchemi = xr.concat(
-            wrfchemis.values(), pd.Index(wrfchemis.keys(), name="source")
+            if isinstance(emiss, EmissionSource):
+                emiss.clear_cache()
+            return wrfchemi
+
+        # Sources are independent and mostly numpy work, build them in threads
+        max_workers = min(len(self.sources), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            wrfchemis = executor.map(source_to_wrfchemi, self.sources.values())
+            if not write_netcdf:
+                # Sources share the wrfinput grid, skip comparing their coordinates
+                return xr.concat(
+                    list(wrfchemis),
+                    pd.Index(self.names(), name="source"),
+                    coords="minimal",
+                    compat="override",
+                    join="override",
+                )
+
+            # Add sources one by one instead of stacking them before the sum.
+            # Pollutants missing in some sources count as 0 in those sources.
+            wrfchemi = None
+            with xr.set_options(keep_attrs=True):
+                for source_wrfchemi in wrfchemis:
+                    source_wrfchemi = source_wrfchemi.drop_vars("Times")
+                    if wrfchemi is None:
+                        wrfchemi = source_wrfchemi
+                        continue
+                    for name, emiss in source_wrfchemi.data_vars.items():
+                        if name in wrfchemi.data_vars:
+                            wrfchemi[name] = wrfchemi[name] + emiss
+                        else:
+                            wrfchemi[name] = emiss
+        wrfchemi["Times"] = xr.DataArray(
+            wemi.create_date_s19(f"{start_date}_00:00:00", wrfchemi.sizes["Time"]),
+            dims=["Time"],
+            coords={"Time": wrfchemi.Time.values},
         )
-        if write_netcdf:
-            wrfchemi = wrfchemi.sum(dim="source", keep_attrs=True)
-            wrfchemi["Times"] = xr.DataArray(
-                wemi.create_date_s19(f"{start_date}_00:00:00", wrfchemi.sizes["Time"]),
-                dims=["Time"],
-                coords={"Time": wrfchemi.Time.values},
-            )
-            wemi.write_wrfchemi_netcdf(wrfchemi, nc_format, path=path)
+        wemi.write_wrfchemi_netcdf(wrfchemi, nc_format, path=path)
         return wrfchemi
 
     def to_cmaq(
@@ -664,6 +846,7 @@ class GroupSources:
         voc_name: str = "VOC",
         write_netcdf: bool = False,
         path: str = "../results",
+        nc_format: str = "NETCDF3_CLASSIC",
     ) -> typing.Dict[str, dict]:
         """Create CMAQ emission file.
 
@@ -681,13 +864,17 @@ class GroupSources:
             voc_name: VOC name in pol_ef or pol_emiss.
             write_netcdf: Save CMAQ emission file.
             path: Location to save CMAQ emission file.
+            nc_format: CMAQ emission netCDF file format.
 
         Returns::
             Keys are emission days. Values are emission in CMAQ
             emission file netCDF format.
         """
-        cmaq_files = {
-            source: emiss.to_cmaq(
+
+        def source_to_cmaq(
+            emiss: EmissionSource | PointSources,
+        ) -> typing.Dict[str, xr.Dataset]:
+            cmaq_days = emiss.to_cmaq(
                 wrfinput,
                 griddesc_path,
                 btrim,
@@ -697,13 +884,19 @@ class GroupSources:
                 pm_name,
                 voc_name,
             )
-            for source, emiss in self.sources.items()
-        }
+            if isinstance(emiss, EmissionSource):
+                emiss.clear_cache()
+            return cmaq_days
+
+        max_workers = min(len(self.sources), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            cmaq_files = dict(
+                zip(self.names(), executor.map(source_to_cmaq, self.sources.values()))
+            )
         cmaq_source_day = cmaq.merge_cmaq_source_emiss(cmaq_files)
-        sum_sources = cmaq.sum_cmaq_sources(cmaq_source_day)
-        cmaq_sum_by_day = cmaq.update_tflag_sources(sum_sources)
+        cmaq_sum_by_day = cmaq.sum_cmaq_sources(cmaq_source_day)
 
         if write_netcdf:
             for cmaq_nc in cmaq_sum_by_day.values():
-                cmaq.save_cmaq_file(cmaq_nc, path)
+                cmaq.save_cmaq_file(cmaq_nc, path, nc_format)
         return cmaq_sum_by_day
@@ -6,15 +6,24 @@ and to perform the spatial emission distribution.
 
 It contains the following functions:
 
-    - `read_spatial_proxy(proxy_path, proxy_shape, col_names, sep, proxy, lon_name, lat_name)` - Returns: spatial proxy (weight) in xr.DataArray.
+    - `read_spatial_proxy(proxy_path, proxy_shape, col_names, sep, proxy, lon_name, lat_name, cache)` - Returns: spatial proxy (weight) in xr.DataArray.
+    - `is_cache_valid(cache_path, proxy_path, cache_shape)` - Returns: if the .npy proxy cache can be used.
     - `calculate_density_map(spatial_proxy, number_sources, cell_area)` - Returns: number of emissions by km^2.
     - `distribute_spatial_emission(spatial_proxy, number_sources, cell_area, use_intensity, pol_ef, pol_name)` - Calculate total emissions of a pollutant (g day^-1 km^-2)
 """
 
+import weakref
+import hashlib
+import numpy as np
 import pandas as pd
 import xarray as xr
+from pathlib import Path
 import siem.emiss as em
 
+# Proxy values and coordinates already read, shared by every source using
+# the same file. Entries live while a proxy DataArray uses them.
+_PROXY_CACHE = weakref.WeakValueDictionary()
+
 
 def read_spatial_proxy(
     proxy_path: str,
@@ -24,11 +33,19 @@ def read_spatial_proxy(
     proxy: str = "urban",
     lon_name: str = "x",
     lat_name: str = "y",
+    cache: bool = False,
 ) -> xr.DataArray:
     """Read spatial proxy.
 
     Read spatial proxy (emission weights) csv file.
     It has to have the same number of points as wrfinput file.
+    Reading the same unmodified file again returns a new DataArray
+    sharing the read-only values and coordinates of the first one, so
+    sources using the same proxy share its memory.
+    With `cache=True` the parsed proxy is stored as a .npy file next to
+    the csv file and memory-mapped on the next reads, as long as the
+    csv file is not modified. The .npy file name has a hash of the
+    reading options, and proxies with non numeric columns are not cached.
 
     Args:
         proxy_path: The location of the csv file.
@@ -38,29 +55,84 @@ def read_spatial_proxy(
         proxy: The column with the proxy value.
         lon_name: Column name of the longitude.
         lat_name: Column name of the latitude.
+        cache: Store and reuse the parsed proxy as a .npy file.
 
     Returns:
         Spatial proxy with dimensions as wrfinput.
     """
-    spatial_proxy = pd.read_csv(proxy_path, names=col_names, sep=sep)
+    proxy_key = (
+        str(Path(proxy_path).resolve()),
+        Path(proxy_path).stat().st_mtime,
+        tuple(proxy_shape),
+        tuple(col_names),
+        sep,
+        proxy,
+        lon_name,
+        lat_name,
+    )
+    urban = _PROXY_CACHE.get((proxy_key, "proxy"))
+    coords = _PROXY_CACHE.get((proxy_key, "coords"))
+    if urban is not None and coords is not None:
+        return _create_proxy_dataarray(urban, coords)
+
     ncol, nrow = proxy_shape
+    key = hashlib.sha1(
+        repr((tuple(col_names), sep, proxy, lon_name, lat_name)).encode()
+    ).hexdigest()
+    cache_path = Path(proxy_path).with_suffix(f".{proxy}.{key}.npy")
+    if cache and is_cache_valid(cache_path, proxy_path, (3, nrow, ncol)):
+        urban, lat, lon = np.load(cache_path, mmap_mode="r")
+    else:
+        spatial_proxy = pd.read_csv(proxy_path, names=col_names, sep=sep)
+        urban = spatial_proxy[proxy].values.reshape(nrow, ncol)
+        lat = spatial_proxy[lat_name].values.reshape(nrow, ncol)
+        lon = spatial_proxy[lon_name].values.reshape(nrow, ncol)
+        is_numeric = all(
+            np.issubdtype(col.dtype, np.number) for col in (urban, lat, lon)
+        )
+        if cache and is_numeric:
+            # float64 keeps the cached proxy equal to the one read from csv
+            urban, lat, lon = np.stack([urban, lat, lon]).astype("float64")
+            np.save(cache_path, np.stack([urban, lat, lon]))
+
+    coords = np.stack([lat, lon]).astype("float32")
+    urban.flags.writeable = False
+    coords.flags.writeable = False
+    _PROXY_CACHE[(proxy_key, "proxy")] = urban
+    _PROXY_CACHE[(proxy_key, "coords")] = coords
+    return _create_proxy_dataarray(urban, coords)
+
+
+def _create_proxy_dataarray(urban: np.ndarray, coords: np.ndarray) -> xr.DataArray:
+    """Wrap proxy values and (XLAT, XLONG) coordinates without copying them."""
+    dims = ("south_north", "west_east")
+    # assign_coords keeps the arrays, the DataArray constructor copies coords
+    return xr.DataArray(urban, dims=dims).assign_coords(
+        XLAT=(dims, coords[0]), XLONG=(dims, coords[1])
+    )
 
-    urban = spatial_proxy[proxy].values.reshape(nrow, ncol)
 
-    lat = spatial_proxy[lat_name].values.reshape(nrow, ncol)
-    lon = spatial_proxy[lon_name].values.reshape(nrow, ncol)
+def is_cache_valid(cache_path: Path, proxy_path: str, cache_shape: tuple) -> bool:
+    """Check if a cached proxy can be used instead of reading the csv file.
 
-    spatial_proxy = xr.DataArray(
-        urban,
-        dims=("south_north", "west_east"),
-        coords={
-            "XLAT": (("south_north", "west_east"), lat),
-            "XLONG": (("south_north", "west_east"), lon),
-        },
-    )
-    spatial_proxy["XLAT"] = spatial_proxy.XLAT.astype("float32")
-    spatial_proxy["XLONG"] = spatial_proxy.XLONG.astype("float32")
-    return spatial_proxy
+    Args:
+        cache_path: Location of the .npy cache file.
+        proxy_path: Location of the csv file.
+        cache_shape: Expected shape of the cached array.
+
+    Returns:
+        True if cache exists, is newer than the csv file, can be loaded
+        and has the expected shape.
+    """
+    if not cache_path.exists():
+        return False
+    if cache_path.stat().st_mtime < Path(proxy_path).stat().st_mtime:
+        return False
+    try:
+        cached = np.load(cache_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return False
+    return cached.shape == cache_shape and cached.dtype == np.float64
 
 
 def calculate_density_map(
@@ -35,10 +35,13 @@ def split_by_time(
     Returns:
         Emissions disaggregated by time.
     """
-    emiss_time = xr.concat(
-        [spatial_emiss * time for time in temporal_profile],
-        dim=pd.Index(np.arange(len(temporal_profile)), name="Time"),
+    time_profile = xr.DataArray(
+        np.asarray(temporal_profile),
+        dims="Time",
+        coords={"Time": np.arange(len(temporal_profile))},
     )
+    emiss_time = (spatial_emiss * time_profile).transpose("Time", ...)
+    emiss_time.name = spatial_emiss.name
     return emiss_time
 
 
@@ -60,12 +63,13 @@ def split_by_time_from(
     Returns:
         Pollutants emissions distributed by time.
     """
-    spatial = spatial_sources.copy()
-    spatio_temporal = {
-        pol: split_by_time(spatial, temporal_profile)
-        for pol, spatial in spatial.items()
-    }
-    return xr.merge(spatio_temporal.values())
+    time_profile = xr.DataArray(
+        np.asarray(temporal_profile),
+        dims="Time",
+        coords={"Time": np.arange(len(temporal_profile))},
+    )
+    # All pollutants share the grid, one broadcast instead of merging each one
+    return (spatial_sources * time_profile).transpose("Time", ...)
 
 
 def transform_week_profile_df(weekday_profile: list[float]) -> pd.DataFrame:
@@ -124,9 +128,12 @@ def split_by_weekday(
         Emission with weekly variation.
     """
     days_factor = assign_factor_simulation_days(date_start, date_end, weekday_profile)
-    days_emiss = {
-        day: emiss_day * factor for day, factor in enumerate(days_factor.frac)
-    }
-    days_emiss_all = xr.concat(days_emiss.values(), dim="Time")
+    n_hours, n_days = emiss_day.sizes["Time"], len(days_factor)
+    hour_factor = xr.DataArray(
+        np.repeat(days_factor.frac.to_numpy(), n_hours), dims="Time"
+    )
+    days_emiss_all = (
+        emiss_day.isel(Time=np.tile(np.arange(n_hours), n_days)) * hour_factor
+    )
     days_emiss_all["Time"] = np.arange(days_emiss_all.sizes["Time"])
     return days_emiss_all
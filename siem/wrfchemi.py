@@ -16,10 +16,11 @@ It contains the following functions:
 """
 
 import typing
+import dask
 import numpy as np
 import pandas as pd
 import xarray as xr
-from siem.emiss import speciate_emission
+from siem.emiss import speciate_emission_batch
 from siem.user import check_create_savedir
 
 
@@ -40,15 +41,12 @@ def transform_wrfchemi_units(
     Returns:
         Emission species in WRF-Chem units.
     """
-    for pol_name, pol_mw in pol_ef_mw.items():
+    emiss_units = {}
+    for pol_name, (_, pol_mw) in pol_ef_mw.items():
         if pol_name == pm_name:
-            spatial_emiss[pm_name] = (
-                spatial_emiss[pm_name] / 3600  # 1E6 to ug / 1E6 to m2
-            ).astype("float32")
-        spatial_emiss[pol_name] = (
-            spatial_emiss[pol_name] / pol_mw[1]  # ok
-        ).astype("float32")
-    return spatial_emiss
+            pol_mw = pol_mw * 3600  # 1E6 to ug / 1E6 to m2
+        emiss_units[pol_name] = (spatial_emiss[pol_name] / pol_mw).astype("float32")
+    return spatial_emiss.assign(emiss_units)
 
 
 def transform_wrfchemi_units_point(
@@ -68,13 +66,14 @@ def transform_wrfchemi_units_point(
     Returns:
         Emission species in WRF-Chem units.
     """
-    emiss_units = spatial_emiss.copy()  # units in g hr^-1
+    emiss_units = {}  # units in g hr^-1
     for pol_name, pol_mw in pols_mw.items():
         if pol_name == pm_name:
-            emiss_units[pol_name] /= cell_area * 3600  # ug  m^-2 s^-1
+            pol_factor = cell_area * 3600  # ug  m^-2 s^-1
         else:
-            emiss_units[pol_name] /= pol_mw * cell_area  # mol km^-2 hr^-1
-    return emiss_units
+            pol_factor = pol_mw * cell_area  # mol km^-2 hr^-1
+        emiss_units[pol_name] = spatial_emiss[pol_name] / pol_factor
+    return spatial_emiss.assign(emiss_units)
 
 
 def add_emission_attributes(
@@ -140,11 +139,8 @@ def speciate_wrfchemi(
         Wrfchemi dataset with species variables with attributes.
 
     """
-    speciated_wrfchemi = speciate_emission(
-        spatial_emiss_units, voc_name, voc_species, cell_area
-    )
-    speciated_wrfchemi = speciate_emission(
-        speciated_wrfchemi, pm_name, pm_species, cell_area
+    speciated_wrfchemi = speciate_emission_batch(
+        spatial_emiss_units, {voc_name: voc_species, pm_name: pm_species}, cell_area
     )
     if add_attr:
         speciated_wrfchemi = add_emission_attributes(
@@ -252,26 +248,39 @@ def write_netcdf(
     file_name: str,
     nc_format: str,
     path: str = "../results/",
-) -> None:
+    compute: bool = True,
+):
     """
     Save netcdf file.
 
+    Emission species are written as float32, compressed when
+    nc_format is a NetCDF4 format.
+
     Args:
         wrfchemi_netcdf: wrfchemi dataset in WRF-Chem wrfchemi netcdf format.
         file_name: wrfchemi file names.
         nc_format: wrfchemi netCDF file format.
         path: Path to save  netcdf.
+        compute: Write dask-backed data now or return a delayed write.
 
     Returns:
-        None
+        None, or a dask.delayed write if compute is False.
 
     """
     check_create_savedir(path)
-    wrfchemi_netcdf.to_netcdf(
+    emiss_encoding = {"dtype": "float32"}
+    if nc_format.startswith("NETCDF4"):
+        emiss_encoding.update({"zlib": True, "complevel": 1})
+    encoding = {
+        pol: emiss_encoding for pol in wrfchemi_netcdf.data_vars if pol != "Times"
+    }
+    encoding["Times"] = {"char_dim_name": "DateStrLen"}
+    return wrfchemi_netcdf.to_netcdf(
         f"{path}/{file_name}",
-        encoding={"Times": {"char_dim_name": "DateStrLen"}},
+        encoding=encoding,
         unlimited_dims={"Time": True},
         format=nc_format,
+        compute=compute,
     )
 
 
@@ -281,6 +290,9 @@ def write_wrfchemi_netcdf(
     """
     Save the wrfchemi in WRF-Chem netcdf format in netcdf file.
 
+    If wrfchemi_netcdf is backed by dask, the files are computed and
+    written in a single dask graph, chunk by chunk.
+
     Args:
         wrfchemi_netcdf: wrfchemi dataset in WRF-Chem wrfchemi netcdf format.
         nc_format: wrfchemi netCDF file format.
@@ -290,13 +302,24 @@ def write_wrfchemi_netcdf(
         None
 
     """
+    compute = not wrfchemi_netcdf.chunks
     if len(wrfchemi_netcdf.Times) == 24:
         file_names = create_wrfchemi_name(wrfchemi_netcdf)
         wrfchemi00z = wrfchemi_netcdf.isel(Time=slice(0, 12))
         wrfchemi12z = wrfchemi_netcdf.isel(Time=slice(12, 24))
-        write_netcdf(wrfchemi00z, file_names[0], nc_format, path)
-        write_netcdf(wrfchemi12z, file_names[1], nc_format, path)
+        writes = [
+            write_netcdf(wrfchemi00z, file_names[0], nc_format, path, compute),
+            write_netcdf(wrfchemi12z, file_names[1], nc_format, path, compute),
+        ]
     else:
-        write_netcdf(
-            wrfchemi_netcdf, create_wrfchemi_name(wrfchemi_netcdf), nc_format, path
-        )
+        writes = [
+            write_netcdf(
+                wrfchemi_netcdf,
+                create_wrfchemi_name(wrfchemi_netcdf),
+                nc_format,
+                path,
+                compute,
+            )
+        ]
+    if not compute:
+        dask.compute(*writes)
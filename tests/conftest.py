@@ -0,0 +1,21 @@
+import pytest
+import numpy as np
+from siem.siem import EmissionSource
+from siem.spatial import read_spatial_proxy
+
+
+@pytest.fixture
+def emission_source() -> EmissionSource:
+    spatial_proxy = read_spatial_proxy("./tests/test_data/highways_hdv.csv",
+                                       (24, 14),
+                                       ["id", "x", "y", "urban"])
+    return EmissionSource("test source",
+                          1_000_000,
+                          1,
+                          {"NOX": (1, 30),
+                           "PM": (1, 30),
+                           "VOC": (1, 100)},
+                          spatial_proxy,
+                          np.random.normal(1, 0.5, size=24),
+                          {"HC3": 0.5, "HC5": 0.5},
+                          {"PM10": 0.3, "PM25_I": 0.7})
@@ -0,0 +1,8 @@
+from siem.cmaq import calculate_hhmmss
+import datetime as dt
+
+
+def test_calculate_hhmmss() -> None:
+    assert calculate_hhmmss(dt.datetime(2024, 1, 1, 12, 5, 3)) == 120503
+    assert calculate_hhmmss(dt.datetime(2024, 1, 1, 9, 0, 7)) == 90007
+    assert calculate_hhmmss(dt.datetime(2024, 1, 1, 0, 0, 0)) == 0
@@ -0,0 +1,48 @@
+import numpy as np
+import geopandas as gpd
+import shapely
+from siem.proxy import create_wrf_grid, calculate_highway_grid
+
+
+def test_calculate_highway_grid() -> None:
+    wrf_grid = create_wrf_grid("./tests/test_data/geo_em.d01.siem_test.nc",
+                               save=False)
+    cell = wrf_grid.geometry.iloc[10]
+    xmin, ymin, xmax, ymax = cell.bounds
+    y_mid = (ymin + ymax) / 2
+    highway = shapely.LineString([(xmin - 0.1, y_mid), (xmax + 0.1, y_mid)])
+    two_way = shapely.LineString(highway.coords[::-1])
+    proxy = gpd.GeoDataFrame({"highway": ["primary", "primary"],
+                              "length": [1.0, 1.0]},
+                             geometry=[highway, two_way], crs="EPSG:4326")
+
+    highway_grid = calculate_highway_grid(wrf_grid, proxy, to_pre=False)
+    highway_km = (gpd.GeoSeries([highway.intersection(cell)], crs="EPSG:4326")
+                  .to_crs("EPSG:32733").length / 1000)
+
+    assert isinstance(highway_grid, gpd.GeoDataFrame)
+    assert len(highway_grid) == len(wrf_grid)
+    assert np.isclose(highway_grid.longKm.iloc[10], highway_km.iloc[0])
+    assert highway_grid.longKm.sum() > highway_grid.longKm.iloc[10]
+
+
+def test_calculate_highway_grid_overlap() -> None:
+    wrf_grid = create_wrf_grid("./tests/test_data/geo_em.d01.siem_test.nc",
+                               save=False)
+    cell = wrf_grid.geometry.iloc[10]
+    xmin, ymin, xmax, ymax = cell.bounds
+    y_mid = (ymin + ymax) / 2
+    x_mid = (xmin + xmax) / 2
+    highway = shapely.LineString([(xmin - 0.1, y_mid), (xmax + 0.1, y_mid)])
+    # Shares the west half of highway inside the cell, split at another node
+    overlap = shapely.LineString([(xmin - 0.1, y_mid), (x_mid, y_mid)])
+    proxy = gpd.GeoDataFrame({"highway": ["primary", "primary"],
+                              "length": [1.0, 1.0]},
+                             geometry=[highway, overlap], crs="EPSG:4326")
+
+    highway_grid = calculate_highway_grid(wrf_grid, proxy, to_pre=False)
+    highway_only = calculate_highway_grid(wrf_grid, proxy.iloc[:1],
+                                          to_pre=False)
+
+    assert np.isclose(highway_grid.longKm.iloc[10],
+                      highway_only.longKm.iloc[10])
@@ -0,0 +1,21 @@
+import numpy as np
+import geopandas as gpd
+import shapely
+from siem.proxy import create_wrf_grid, calculate_points_grid
+
+
+def test_calculate_points_grid() -> None:
+    wrf_grid = create_wrf_grid("./tests/test_data/geo_em.d01.siem_test.nc",
+                               save=False)
+    centroids = wrf_grid.centroid
+    # One point in each cell plus three points outside domain
+    xmin, ymin, _, _ = wrf_grid.total_bounds
+    points = np.concatenate([shapely.points(centroids.x, centroids.y),
+                             shapely.points([xmin - 1] * 3, [ymin - 1] * 3)])
+    proxy = gpd.GeoDataFrame(geometry=points, crs="EPSG:4326")
+
+    points_grid = calculate_points_grid(wrf_grid, proxy, to_pre=False)
+
+    assert isinstance(points_grid, gpd.GeoDataFrame)
+    assert len(points_grid) == len(wrf_grid)
+    assert (points_grid.n_sources == 1).all()
@@ -3,7 +3,7 @@ import numpy as np
 from siem.siem import EmissionSource
 from siem.spatial import read_spatial_proxy
 from siem.cmaq import prepare_netcdf_cmaq
-from siem.cmaq import create_global_attrs
+from siem.cmaq import create_global_attrs, calculate_julian
 
 
 def test_create_global_attrs() -> None:
@@ -31,6 +31,7 @@ def test_create_global_attrs() -> None:
                                           pm_species,
                                           pm_name="PM", voc_name="VOC")
 
+    cached_dates = calculate_julian.cache_info().currsize
     global_attrs = create_global_attrs(speciated_attrs, "./tests/test_data/GRIDDESC")
 
     assert isinstance(global_attrs, dict)
@@ -38,3 +39,4 @@ def test_create_global_attrs() -> None:
     assert len(global_attrs["FILEDESC"]) == 80
     assert len(global_attrs["VAR-LIST"]) == 16 * 7
     assert global_attrs["GDTYP"] == 7
+    assert calculate_julian.cache_info().currsize == cached_dates
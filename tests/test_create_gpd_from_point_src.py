@@ -1,5 +1,6 @@
 from siem.point import create_gpd_from
 import os
+import pytest
 import numpy as np
 import pandas as pd
 import geopandas as gpd
@@ -27,3 +28,24 @@ def test_create_gpd_from() -> None:
     assert isinstance(point_sources, gpd.GeoDataFrame)
     assert "lat" not in point_sources.columns
     assert "lon" not in point_sources.columns
+
+
+def test_create_gpd_from_pyarrow_sep(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    lat: np.ndarray = np.arange(-13, -12.5, 0.05)
+    sample = pd.DataFrame.from_dict({
+            "lat": lat,
+            "lon": np.linspace(-43, -42.5, len(lat)),
+            "so2": np.random.random(len(lat)) * 100})
+    comma_path = tmp_path / "point_sample.csv"
+    space_path = tmp_path / "point_sample.txt"
+    sample.to_csv(comma_path, sep=",", index=False)
+    sample.to_csv(space_path, sep=" ", index=False)
+
+    comma_sources = create_gpd_from(comma_path, sep=",",
+                                    lat_name="lat", lon_name="lon")
+    space_sources = create_gpd_from(space_path, sep=r"\s+",
+                                    lat_name="lat", lon_name="lon")
+
+    np.testing.assert_allclose(space_sources.so2, comma_sources.so2)
+    assert space_sources.geometry.equals(comma_sources.geometry)
@@ -1,4 +1,4 @@
-from siem.cmaq import create_tflag_matrix
+from siem.cmaq import create_tflag_matrix, create_tflag_matrix_batch
 import numpy as np
 
 
@@ -11,3 +11,21 @@ def test_create_tflag_matrix() -> None:
     assert tflag_m.dtype == np.dtype("int32")
     assert tflag_m[0, 0, 0] == 2018182
     assert tflag_m[-1, 0, 0] == 2018183
+
+
+def test_create_tflag_matrix_cached() -> None:
+    tflag_m = create_tflag_matrix("2018-07-01", 10)
+
+    assert create_tflag_matrix("2018-07-01", 10) is tflag_m
+    assert not tflag_m.flags.writeable
+
+
+def test_create_tflag_matrix_batch() -> None:
+    dates = ["2018-07-01", "2018-12-31"]
+    tflag_batch = create_tflag_matrix_batch(dates, 10)
+
+    assert tflag_batch.shape == (2, 25, 10, 2)
+    assert tflag_batch.dtype == np.dtype("int32")
+    for date, tflag_m in zip(dates, tflag_batch):
+        assert (tflag_m == create_tflag_matrix(date, 10)).all()
+    assert tflag_batch[1, -1, 0, 0] == 2019001
@@ -0,0 +1,14 @@
+import xarray as xr
+from siem.proxy import get_domain_extension
+
+
+def test_get_domain_extension() -> None:
+    geo_path = "./tests/test_data/geo_em.d01.siem_test.nc"
+    geo = xr.open_dataset(geo_path)
+    north, south, east, west = get_domain_extension(geo_path)
+
+    assert north == geo.XLAT_C.max().values
+    assert south == geo.XLAT_C.min().values
+    assert east == geo.XLONG_C.max().values
+    assert west == geo.XLONG_C.min().values
+    assert get_domain_extension(geo_path) == (north, south, east, west)
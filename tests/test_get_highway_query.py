@@ -12,5 +12,10 @@ def test_get_highway_query_link() -> None:
     assert my_query == '["highway"~"primary|motorway|primary_link|motorway_link"]'
 
 
+def test_get_highway_query_keeps_types() -> None:
+    highway_types = ["motorway", "primary"]
+    first_query = get_highway_query(highway_types, add_links=True)
+    second_query = get_highway_query(highway_types, add_links=True)
 
-
+    assert highway_types == ["motorway", "primary"]
+    assert first_query == second_query
@@ -0,0 +1,16 @@
+import numpy as np
+from siem.proxy import get_osm_cache_path
+
+
+def test_get_osm_cache_path() -> None:
+    bbox = (np.float32(-23.37), np.float32(-23.74), -46.29, -46.98)
+    fuel_path = get_osm_cache_path("../data", bbox, {"amenity": "fuel"}, "gpkg")
+
+    assert fuel_path.startswith("../data/cache/")
+    assert fuel_path.endswith(".gpkg")
+    assert fuel_path == get_osm_cache_path("../data", bbox,
+                                           {"amenity": "fuel"}, "gpkg")
+    assert fuel_path != get_osm_cache_path("../data", bbox,
+                                           {"amenity": "school"}, "gpkg")
+    assert get_osm_cache_path("../data", bbox, '["highway"~"primary"]',
+                              "graphml").endswith(".graphml")
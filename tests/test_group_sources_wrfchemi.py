@@ -59,3 +59,85 @@ def test_group_sources() -> None:
     assert "source" in wrfchemi.dims
     assert ((test1.E_NOX.sum() * 3).values - wrfchemi.E_NOX.sum(dim="source").sum().values) <= 1
 
+
+def test_group_sources_write_netcdf(tmp_path) -> None:
+    spatial_proxy = read_spatial_proxy("./tests/test_data/highways_hdv.csv",
+                                       (24, 14),
+                                       ["id", "x", "y", "urban"])
+    voc_species = {"HC3": 0.5, "HC5": 0.25, "HC8": 0.25}
+    pm_species = {"PM10": 0.3, "PM25_I": 0.7 * 0.5, "PM25_J": 0.7 * 0.5}
+
+    wrfinput = xr.open_dataset("./tests/test_data/wrfinput_d01_siem_test")
+    temp_prof = np.random.normal(1, 0.5, size=24)
+
+    sources_list = [
+        EmissionSource(f"test source{n}",
+                       1_000_000 * n,
+                       1,
+                       {"NOX": (1, 30),
+                        "PM": (1, 30),
+                        "VOC": (1, 100)},
+                       spatial_proxy,
+                       temp_prof,
+                       voc_species,
+                       pm_species)
+        for n in range(1, 4)
+    ]
+    sources = GroupSources(sources_list)
+
+    start, end = "2024-03-01", "2024-03-02"
+    by_source = sources.to_wrfchemi(wrfinput, start, end)
+    wrfchemi = sources.to_wrfchemi(wrfinput, start, end,
+                                   write_netcdf=True, path=str(tmp_path))
+
+    assert "source" not in wrfchemi.dims
+    assert wrfchemi.E_NOX.attrs["units"] == "mol km^-2 hr^-1"
+    assert wrfchemi.attrs["TITLE"] == "OUTPUT FROM LAPAT PREPROCESSOR"
+    np.testing.assert_allclose(wrfchemi.E_NOX,
+                               by_source.E_NOX.sum(dim="source"),
+                               rtol=1e-6)
+    assert len(list(tmp_path.glob("wrfchemi_*"))) == 2
+    wrfchemi_00z = xr.open_dataset(tmp_path / "wrfchemi_00z_d01")
+    assert wrfchemi_00z.E_NOX.dtype == np.float32
+
+
+def test_group_sources_write_netcdf_missing_pol(tmp_path) -> None:
+    spatial_proxy = read_spatial_proxy("./tests/test_data/highways_hdv.csv",
+                                       (24, 14),
+                                       ["id", "x", "y", "urban"])
+    voc_species = {"HC3": 0.5, "HC5": 0.5}
+    pm_species = {"PM10": 0.3, "PM25_I": 0.7}
+
+    wrfinput = xr.open_dataset("./tests/test_data/wrfinput_d01_siem_test")
+    temp_prof = np.random.normal(1, 0.5, size=24)
+
+    with_co = EmissionSource("with co",
+                             1_000_000,
+                             1,
+                             {"NOX": (1, 30), "CO": (2, 28),
+                              "PM": (1, 30), "VOC": (1, 100)},
+                             spatial_proxy,
+                             temp_prof,
+                             voc_species,
+                             pm_species)
+    without_co = EmissionSource("without co",
+                                1_000_000,
+                                1,
+                                {"NOX": (1, 30),
+                                 "PM": (1, 30), "VOC": (1, 100)},
+                                spatial_proxy,
+                                temp_prof,
+                                voc_species,
+                                pm_species)
+    sources = GroupSources([with_co, without_co])
+
+    start, end = "2024-03-01", "2024-03-02"
+    co_only = with_co.to_wrfchemi(wrfinput, start, end)
+    wrfchemi = sources.to_wrfchemi(wrfinput, start, end,
+                                   write_netcdf=True, path=str(tmp_path))
+
+    assert not with_co._st_cache and not without_co._st_cache
+    assert "E_CO" in wrfchemi.data_vars
+    np.testing.assert_allclose(wrfchemi.E_CO, co_only.E_CO, rtol=1e-6)
+    assert wrfchemi.E_CO.attrs == co_only.E_CO.attrs
+    assert not wrfchemi.E_NOX.isnull().any()
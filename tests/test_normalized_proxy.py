@@ -0,0 +1,22 @@
+from siem.siem import EmissionSource
+from siem.spatial import read_spatial_proxy
+import numpy as np
+
+
+def test_normalized_proxy_shared() -> None:
+    spatial_proxy = read_spatial_proxy(
+        "./tests/test_data/highways_hdv.csv",
+        (14, 24), ["id", "x", "y", "longkm"],
+        proxy="longkm")
+    pol_ef = {"CO": (0.173, 28), "VOC": (0.012, 100)}
+
+    ldv = EmissionSource("LDV", 1_000_000, 41, pol_ef, spatial_proxy,
+                         [1 / 24] * 24, {}, {})
+    bike = EmissionSource("Bike", 100_000, 30, pol_ef, spatial_proxy,
+                          [1 / 24] * 24, {}, {})
+
+    assert ldv.normalized_proxy is bike.normalized_proxy
+    assert np.isclose(ldv.normalized_proxy.sum(), 1.0)
+
+    co_total = ldv.spatial_emission("CO", 9).sum() * 9
+    assert np.isclose(co_total, ldv.total_emission("CO"))
@@ -44,3 +44,23 @@ def test_add_cmaq_emission_attrs() -> None:
     assert len(speciated_attrs.attrs["VAR-LIST"]) == 7 * 16
     assert speciated_attrs.sizes["ROW"] == (ori_row - 2 * (btrim + 1))
     assert speciated_attrs.sizes["COL"] == (ori_col - 2 * (btrim + 1))
+
+
+def test_prepare_netcdf_cmaq_dask(emission_source) -> None:
+    voc_species = emission_source.voc_spc
+    pm_species = emission_source.pm_spc
+    speciated = emission_source.speciate_all(1, is_cmaq=True)
+
+    btrim = 2
+    cmaq_nc = prepare_netcdf_cmaq(speciated, "2018-07-01",
+                                  "./tests/test_data/GRIDDESC", btrim,
+                                  voc_species, pm_species)
+    cmaq_lazy = prepare_netcdf_cmaq(speciated.chunk({"west_east": 5}),
+                                    "2018-07-01",
+                                    "./tests/test_data/GRIDDESC", btrim,
+                                    voc_species, pm_species)
+
+    assert cmaq_lazy.NOX.chunks is not None
+    assert cmaq_lazy.chunks["COL"] == (cmaq_nc.sizes["COL"],)
+    assert cmaq_lazy.chunks["TSTEP"] == (1,) * 25
+    np.testing.assert_allclose(cmaq_lazy.NOX.values, cmaq_nc.NOX.values)
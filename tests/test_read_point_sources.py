@@ -31,3 +31,26 @@ def test_read_point_sources() -> None:
     assert isinstance(emiss_ready, xr.Dataset)
     assert emiss_ready.no2.sum().values - sample.no2.sum() <= 1e-10
     assert emiss_ready.so2.sum().values - sample.no2.sum() <= 1e-10
+
+
+def test_read_point_sources_chunks(tmp_path) -> None:
+    geo_path = "./tests/test_data/geo_em.d01.siem_test.nc"
+    geo = xr.open_dataset(geo_path)
+    _, nrow, ncol = geo.XLAT_M.shape
+    lat = np.arange(geo.XLAT_M.min(), geo.XLAT_M.max(), 0.05)
+    lon = np.linspace(geo.XLONG_M.min(), geo.XLONG_M.max(), len(lat))
+    sample = pd.DataFrame.from_dict({
+        "LAT": lat,
+        "LON": lon,
+        "SO2": np.random.random(len(lat)) * 10,
+        "NO2": np.random.random(len(lat)) * 100})
+    sample_path = tmp_path / "sample_chunks.csv"
+    sample.to_csv(sample_path, sep="\t", index=False)
+
+    lazy_emiss = read_point_sources(sample_path, geo_path, ncol, nrow)
+    eager_emiss = read_point_sources(sample_path, geo_path, ncol, nrow,
+                                     chunks=None)
+
+    assert lazy_emiss.SO2.chunks is not None
+    assert eager_emiss.SO2.chunks is None
+    xr.testing.assert_allclose(lazy_emiss.compute(), eager_emiss)
@@ -1,3 +1,5 @@
+import shutil
+import numpy as np
 import xarray as xr
 from siem.spatial import read_spatial_proxy
 
@@ -9,3 +11,72 @@ def test_read_spatial_proxy_col_names() -> None:
                                        proxy="lon")
     assert isinstance(spatial_proxy, xr.DataArray)
     assert spatial_proxy.min() >= 0.0
+
+
+def test_read_spatial_proxy_cache(tmp_path) -> None:
+    proxy_path = tmp_path / "highways_hdv.csv"
+    shutil.copy("./tests/test_data/highways_hdv.csv", proxy_path)
+    col_names = ["id", "x", "y", "lon"]
+
+    spatial_proxy = read_spatial_proxy(proxy_path, (24, 14), col_names,
+                                       proxy="lon", cache=True).copy()
+    cached_proxy = read_spatial_proxy(proxy_path, (24, 14), col_names,
+                                      proxy="lon", cache=True)
+
+    assert len(list(tmp_path.glob("highways_hdv.lon.*.npy"))) == 1
+    xr.testing.assert_identical(spatial_proxy, cached_proxy)
+
+
+def test_read_spatial_proxy_cache_options(tmp_path) -> None:
+    proxy_path = tmp_path / "highways_hdv.csv"
+    shutil.copy("./tests/test_data/highways_hdv.csv", proxy_path)
+
+    read_spatial_proxy(proxy_path, (24, 14), ["id", "x", "y", "lon"],
+                       proxy="lon", cache=True)
+    swapped_proxy = read_spatial_proxy(proxy_path, (24, 14),
+                                       ["id", "x", "y", "lon"],
+                                       proxy="lon", lon_name="y",
+                                       lat_name="x", cache=True)
+
+    assert len(list(tmp_path.glob("highways_hdv.lon.*.npy"))) == 2
+    assert (swapped_proxy.XLONG.values != swapped_proxy.XLAT.values).any()
+    np.testing.assert_array_equal(
+        swapped_proxy.XLAT.values,
+        read_spatial_proxy(proxy_path, (24, 14), ["id", "x", "y", "lon"],
+                           proxy="lon").XLONG.values)
+
+
+def test_read_spatial_proxy_cache_corrupted(tmp_path) -> None:
+    proxy_path = tmp_path / "highways_hdv.csv"
+    shutil.copy("./tests/test_data/highways_hdv.csv", proxy_path)
+    col_names = ["id", "x", "y", "lon"]
+
+    spatial_proxy = read_spatial_proxy(proxy_path, (24, 14), col_names,
+                                       proxy="lon", cache=True).copy()
+    cache_path, = tmp_path.glob("highways_hdv.lon.*.npy")
+    cache_path.write_bytes(b"not a npy file")
+    assert cache_path.stat().st_mtime >= proxy_path.stat().st_mtime
+
+    cached_proxy = read_spatial_proxy(proxy_path, (24, 14), col_names,
+                                      proxy="lon", cache=True)
+    xr.testing.assert_identical(spatial_proxy, cached_proxy)
+
+
+def test_read_spatial_proxy_shared() -> None:
+    spatial_proxy = read_spatial_proxy("./tests/test_data/highways_hdv.csv",
+                                       (24, 14),
+                                       col_names=["id", "x", "y", "lon"],
+                                       proxy="lon")
+    same_proxy = read_spatial_proxy("./tests/test_data/highways_hdv.csv",
+                                    (24, 14),
+                                    col_names=["id", "x", "y", "lon"],
+                                    proxy="lon")
+
+    same_proxy.attrs["units"] = "km"
+    same_proxy = same_proxy.assign_coords(XLAT=same_proxy.XLAT + 1)
+
+    assert same_proxy is not spatial_proxy
+    assert np.shares_memory(same_proxy.values, spatial_proxy.values)
+    assert (same_proxy.XLAT != spatial_proxy.XLAT).all()
+    assert "units" not in spatial_proxy.attrs
+    assert not spatial_proxy.values.flags.writeable
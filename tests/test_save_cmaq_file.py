@@ -0,0 +1,20 @@
+import xarray as xr
+import numpy as np
+from siem.cmaq import prepare_netcdf_cmaq, save_cmaq_file
+
+
+def test_save_cmaq_file_netcdf4(emission_source, tmp_path) -> None:
+    speciated = emission_source.speciate_all(1, is_cmaq=True)
+    cmaq_nc = prepare_netcdf_cmaq(speciated, "2018-07-01",
+                                  "./tests/test_data/GRIDDESC", 2,
+                                  emission_source.voc_spc,
+                                  emission_source.pm_spc)
+
+    save_cmaq_file(cmaq_nc, str(tmp_path), nc_format="NETCDF4_CLASSIC")
+    saved = xr.open_dataset(tmp_path / "cmaq_emissions_20180701.nc")
+
+    assert saved.NOX.encoding["zlib"]
+    assert saved.NOX.encoding["chunksizes"] == (1, 1, cmaq_nc.sizes["ROW"],
+                                                cmaq_nc.sizes["COL"])
+    assert (saved.TFLAG.values == cmaq_nc.TFLAG.values).all()
+    np.testing.assert_allclose(saved.NOX.values, cmaq_nc.NOX.values)
@@ -1,3 +1,4 @@
+import pytest
 import xarray as xr
 import numpy as np
 from siem.siem import EmissionSource
@@ -80,3 +81,47 @@ def test_spatiotemporal_emission_cmaq() -> None:
     assert spatio_temp.CO.isel(Time=0).sum() - spatio_temp.CO.isel(Time=-1).sum() <= 1e-10
 
 
+def test_spatiotemporal_emission_cached(emission_source) -> None:
+    spatio_temp = emission_source.spatiotemporal_emission(["NOX", "VOC"], 1)
+    spatio_temp["NO2"] = spatio_temp.NOX * 0.1
+    spatio_temp_again = emission_source.spatiotemporal_emission(["NOX", "VOC"], 1)
+
+    assert spatio_temp_again is not spatio_temp
+    assert spatio_temp_again.VOC.values is spatio_temp.VOC.values
+    assert "NO2" not in spatio_temp_again
+    assert not spatio_temp_again.NOX.values.flags.writeable
+    with pytest.raises(TypeError):
+        emission_source.pol_ef["NOX"] = (2, 30)
+
+    emission_source.number = 2_000_000
+    spatio_temp_double = emission_source.spatiotemporal_emission(["NOX", "VOC"], 1)
+
+    assert spatio_temp_double is not spatio_temp
+    assert np.isclose(spatio_temp_double.NOX.sum(), 2 * spatio_temp.NOX.sum())
+
+
+def test_spatiotemporal_emission_chunks(emission_source) -> None:
+    spatio_temp = emission_source.spatiotemporal_emission(["NOX", "VOC"], 1)
+    spatio_temp_lazy = emission_source.spatiotemporal_emission(
+        ["NOX", "VOC"], 1, chunks={"south_north": 5})
+
+    assert spatio_temp_lazy.NOX.chunks is not None
+    assert spatio_temp_lazy.NOX.dims == spatio_temp.NOX.dims
+    xr.testing.assert_allclose(spatio_temp_lazy.compute(), spatio_temp)
+
+
+def test_spatiotemporal_emission_cache_bounded(emission_source) -> None:
+    temp_prof = np.random.normal(1, 0.5, size=24)
+    emission_source.temporal_prof = temp_prof
+    temp_prof[3] = 0.0
+
+    assert emission_source.temporal_prof[3] != 0.0
+    with pytest.raises(ValueError):
+        emission_source.temporal_prof[3] = 0.0
+
+    emission_source.spatiotemporal_emission(["NOX"], 1)
+    emission_source.spatiotemporal_emission(["NOX"], 1, is_cmaq=True)
+    assert len(emission_source._st_cache) == 1
+
+    emission_source.clear_cache()
+    assert not emission_source._st_cache
@@ -2,6 +2,7 @@ import xarray as xr
 import numpy as np
 from siem.siem import EmissionSource
 from siem.spatial import read_spatial_proxy
+from siem.emiss import speciate_emission, speciate_emission_batch
 
 
 def test_speciate_emission() -> None:
@@ -31,3 +32,30 @@ def test_speciate_emission() -> None:
 
     assert isinstance(speaciate_emiss, xr.Dataset)
     assert np.round(nox_total) == np.round(no_total + no2_total)
+
+
+def test_speciate_emission_batch() -> None:
+    spatio_temporal = xr.Dataset(
+        {"VOC": (("Time", "y", "x"), np.random.random((3, 4, 5))),
+         "PM": (("Time", "y", "x"), np.random.random((3, 4, 5)))})
+    voc_spc = {"HC3": 0.6, "HC5": 0.4}
+    pm_spc = {"PM10": 0.3, "PM25": 0.7}
+
+    batch = speciate_emission_batch(spatio_temporal,
+                                    {"VOC": voc_spc, "PM": pm_spc}, 1)
+    one_by_one = speciate_emission(
+        speciate_emission(spatio_temporal, "VOC", voc_spc, 1), "PM", pm_spc, 1)
+
+    assert list(batch.data_vars) == ["VOC", "PM", "HC3", "HC5", "PM10", "PM25"]
+    xr.testing.assert_identical(batch, one_by_one)
+
+
+def test_speciate_emission_batch_int() -> None:
+    spatio_temporal = xr.Dataset(
+        {"VOC": (("Time", "y", "x"), np.full((3, 4, 5), 10))})
+
+    batch = speciate_emission_batch(spatio_temporal,
+                                    {"VOC": {"HC3": 0.6, "HC5": 0.4}}, 1)
+
+    np.testing.assert_allclose(batch.HC3, 6)
+    np.testing.assert_allclose(batch.HC5, 4)
@@ -0,0 +1,16 @@
+import numpy as np
+import xarray as xr
+from siem.wrfchemi import write_wrfchemi_netcdf
+
+
+def test_write_wrfchemi_netcdf_dask(emission_source, tmp_path) -> None:
+    wrfinput = xr.open_dataset("./tests/test_data/wrfinput_d01_siem_test")
+    wrfchemi = emission_source.to_wrfchemi(wrfinput, "2024-03-01", "2024-03-01")
+
+    write_wrfchemi_netcdf(wrfchemi.chunk({"Time": 6}), "NETCDF3_64BIT",
+                          str(tmp_path))
+    wrfchemi_00z = xr.open_dataset(tmp_path / "wrfchemi_00z_d01")
+
+    assert wrfchemi_00z.sizes["Time"] == 12
+    np.testing.assert_allclose(wrfchemi_00z.E_NOX,
+                               wrfchemi.E_NOX.isel(Time=slice(0, 12)))